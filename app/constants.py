@@ -2,20 +2,27 @@ import regex as re
 
 
 CHUNK_DOWNLOAD_THRESHOLD = 10 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 MAX_DOWNLOAD_RETRIES = 1
+MAX_DRIVE_LIST_RETRIES = 5
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Seconds, the same as googleapiclient's default for its httplib2 requests
+DRIVE_HTTP_TIMEOUT = 60
 
 NAME_REGEX = re.compile(r"^[\p{L}]+(?:[’'\- ]\p{L}+)*$", re.UNICODE)
 
 GOOGLE_AUTH_SCOPES = ["https://www.googleapis.com/auth/drive"]
 
 DRIVE_FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
-DOC_COMPATIBLE_MIME_TYPES = [
-    "application/vnd.google-apps.document",  # native Google Doc
-    "application/msword",  # .doc
-    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # .docx
-    "application/rtf",  # .rtf
-    "application/vnd.oasis.opendocument.text",  # .odt
-    "text/plain",  # .txt
-]
+DOC_COMPATIBLE_MIME_TYPES = frozenset(
+    {
+        "application/vnd.google-apps.document",  # native Google Doc
+        "application/msword",  # .doc
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # .docx
+        "application/rtf",  # .rtf
+        "application/vnd.oasis.opendocument.text",  # .odt
+        "text/plain",  # .txt
+    }
+)
 
 DEFAULT_VARIABLE_ORDER = 10
@@ -22,6 +22,8 @@ from app.models import (
     SavedVariable,
     Scope,
 )
+from app.services.email import close_email_client
+from app.services.google_drive_async import close_drive_client
 from app.utils.cleanup import periodic_cleanup
 
 @asynccontextmanager
@@ -51,6 +53,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except asyncio.CancelledError:
         pass
 
+    await close_email_client()
+    await close_drive_client()
+
 
 origins = settings.ALLOWED_ORIGINS.split(",") if settings.ALLOWED_ORIGINS else []
 
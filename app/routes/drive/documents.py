@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, cast
 from io import BytesIO
 import os
@@ -32,10 +33,10 @@ from app.services.documents import (
     validate_document_mime_type,
     validate_variables_for_document,
 )
-from app.services.google_drive import (
-    download_file,
-    get_drive_item_metadata,
-    format_drive_file_metadata,
+from app.services.google_drive import format_drive_file_metadata
+from app.services.google_drive_async import (
+    download_file_async,
+    get_drive_item_metadata_async,
 )
 from app.services.resource_limits import (
     ResourceLimitError,
@@ -50,6 +51,7 @@ from app.enums import FORMAT_TO_MIME, DocumentResponseFormat
 from app.schemas.auth import AuthorizedUser
 from app.services.scopes import require_document_access
 from app.constants import DEFAULT_VARIABLE_ORDER
+from app.utils.temp_files import temp_file_allocator
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -147,7 +149,7 @@ async def get_document(
     await require_document_access(document_id, authorized_user)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -212,7 +214,7 @@ async def get_document_file(
     await require_document_access(document_id, authorized_user)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -239,7 +241,7 @@ async def get_variables_for_document(
     await require_document_access(document_id, authorized_user)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -301,7 +303,7 @@ async def get_raw_document(
     await require_document_access(document_id, authorized_user)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -320,10 +322,10 @@ async def get_raw_document(
     try:
         if file.mime_type == "application/vnd.google-apps.document":
             media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            download_file(file.id, content, media_type, file.size)
+            await download_file_async(file.id, content, media_type, file.size)
         else:
             media_type = file.mime_type
-            download_file(file.id, content, None, file.size)
+            await download_file_async(file.id, content, None, file.size)
     except ResourceLimitError as e:
         raise HTTPException(status_code=413, detail=str(e))
 
@@ -365,7 +367,7 @@ async def preview_document(
     format = resolve_format(accept, format)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -380,11 +382,11 @@ async def preview_document(
         raise HTTPException(status_code=413, detail=str(e))
 
     try:
-        file_path = download_template_as_format(file, format)
+        file_path = await asyncio.to_thread(download_template_as_format, file, format)
     except ResourceLimitError as e:
         raise handle_resource_limit_error(e)
 
-    background_tasks.add_task(os.remove, file_path)
+    background_tasks.add_task(temp_file_allocator.release, file_path)
 
     return FileResponse(
         path=file_path,
@@ -424,7 +426,7 @@ async def validate_provided_variables_for_document(
     validate_document_generation_request(body.variables)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -504,7 +506,7 @@ async def generate_document_with_variables(
     validate_document_generation_request(body.variables)
 
     try:
-        file_metadata = get_drive_item_metadata(document_id)
+        file_metadata = await get_drive_item_metadata_async(document_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Document not found or access denied"
@@ -529,7 +531,7 @@ async def generate_document_with_variables(
     except ValidationErrorsException as e:
         return JSONResponse(status_code=400, content={"errors": e.errors})
 
-    background_tasks.add_task(os.remove, file_path)
+    background_tasks.add_task(temp_file_allocator.release, file_path)
 
     if file.mime_type == "application/vnd.google-apps.document":
         filename = file.name
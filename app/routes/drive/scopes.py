@@ -8,8 +8,8 @@ from app.limiter import limiter
 from app.models import Scope, ScopeRestrictions, User
 from app.schemas.common_responses import DetailResponse, Paginated
 from app.schemas.scopes import ScopeCreate, ScopeResponse, ScopeUpdate
-from app.services.google_drive import get_drive_item_metadata
-from app.services.scopes import get_scope_by_drive_id
+from app.services.google_drive_async import get_drive_item_metadata_async
+from app.services.scopes import get_scope_by_drive_id, invalidate_scopes_cache
 from app.utils.paginate import paginate
 
 
@@ -84,7 +84,7 @@ async def create_scope(
 ) -> ScopeResponse:
     """Create a new scope (admin only)."""
     try:
-        metadata = get_drive_item_metadata(body.drive_id)
+        metadata = await get_drive_item_metadata_async(body.drive_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Drive item not found")
 
@@ -106,6 +106,7 @@ async def create_scope(
         updated_by=cast(Link[User], current_user),
     )
     await scope.insert()
+    invalidate_scopes_cache()
 
     return ScopeResponse(**scope.model_dump())
 
@@ -157,6 +158,7 @@ async def update_scope_restrictions(
     )
     scope.updated_by = cast(Link[User], current_user)
     await scope.save_changes()
+    invalidate_scopes_cache()
 
     return ScopeResponse(**scope.model_dump())
 
@@ -193,6 +195,7 @@ async def pin_scope(
     scope.is_pinned = True
     scope.updated_by = cast(Link[User], current_user)
     await scope.save_changes()
+    invalidate_scopes_cache()
 
     return ScopeResponse(**scope.model_dump())
 
@@ -229,6 +232,7 @@ async def unpin_scope(
     scope.is_pinned = False
     scope.updated_by = cast(Link[User], current_user)
     await scope.save_changes()
+    invalidate_scopes_cache()
 
     return ScopeResponse(**scope.model_dump())
 
@@ -251,5 +255,6 @@ async def delete_scope(
         raise HTTPException(status_code=404, detail="Scope not found")
 
     await scope.delete()
+    invalidate_scopes_cache()
 
     return DetailResponse(detail="Scope deleted successfully")
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, Query, Request, Response
 
 from app.dependencies import get_authorized_user_optional
@@ -47,7 +48,7 @@ async def get_tree(
         None, description="Optional folder ID to get tree for a specific folder"
     ),
     authorized_user: AuthorizedUser | None = Depends(get_authorized_user_optional),
-) -> FolderTree:
+) -> Response:
     """
     Get tree structure for scopes.
 
@@ -56,10 +57,15 @@ async def get_tree(
 
     Only shows items the user has access to based on scope restrictions.
     """
-    drive_items = get_accessible_files_and_folders()
+    drive_items = await asyncio.to_thread(get_accessible_files_and_folders)
     children_map = build_children_map(drive_items)
 
     if folder_id is not None:
-        return await get_single_folder_tree(folder_id, children_map, authorized_user)
+        tree = await get_single_folder_tree(folder_id, children_map, authorized_user)
+    else:
+        tree = await get_all_pinned_scopes_tree(children_map, authorized_user)
 
-    return await get_all_pinned_scopes_tree(children_map, authorized_user)
+    # The tree is assembled from validated models, so it is serialized in one
+    # pass by pydantic-core instead of being validated and encoded again as
+    # the response model.
+    return Response(content=tree.model_dump_json(), media_type="application/json")
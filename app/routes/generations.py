@@ -15,10 +15,8 @@ from fastapi.responses import FileResponse, JSONResponse
 from app.enums import DocumentResponseFormat, UserRole, FORMAT_TO_MIME
 from app.limiter import limiter
 from app.schemas.common_responses import DetailResponse, PaginationMeta
-from app.services.google_drive import (
-    format_drive_file_metadata,
-    get_drive_item_metadata,
-)
+from app.services.google_drive import format_drive_file_metadata
+from app.services.google_drive_async import get_drive_item_metadata_async
 from app.services.documents import (
     generate_document,
     validate_document_generation_request,
@@ -31,6 +29,7 @@ from app.schemas.generations import GenerationResponse
 from app.schemas.common_responses import Paginated
 from app.dependencies import get_authorized_user, require_admin
 from app.exceptions import ValidationErrorsException
+from app.utils.temp_files import temp_file_allocator
 
 
 router = APIRouter(prefix="/generations", tags=["generations"])
@@ -235,7 +234,7 @@ async def regenerate_by_id(
     validate_document_generation_request(variables_to_use)
 
     try:
-        file_metadata = get_drive_item_metadata(generation.template_id)
+        file_metadata = await get_drive_item_metadata_async(generation.template_id)
     except Exception:
         raise HTTPException(
             status_code=404, detail="Template not found or access denied"
@@ -253,7 +252,7 @@ async def regenerate_by_id(
     except ValidationErrorsException as e:
         return JSONResponse(status_code=400, content={"errors": e.errors})
 
-    background_tasks.add_task(os.remove, file_path)
+    background_tasks.add_task(temp_file_allocator.release, file_path)
 
     if file.mime_type == "application/vnd.google-apps.document":
         filename = file.name
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import Any, cast
 from bson import DBRef
@@ -26,8 +27,13 @@ from app.schemas.variables import (
     SavedVariableResponse,
     VariableBatchSaveRequest,
 )
-from app.services.google_drive import get_drive_item_metadata, get_item_path
-from app.services.variables import build_overrides_map, get_variable_overrides
+from app.services.google_drive import get_item_path
+from app.services.google_drive_async import get_drive_item_metadata_async
+from app.services.variables import (
+    build_overrides_map,
+    get_variable_overrides,
+    validate_against_schema,
+)
 from app.utils.paginate import paginate
 from app.constants import DEFAULT_VARIABLE_ORDER
 
@@ -81,7 +87,7 @@ async def get_variables(
         else:
             # Get scope chain for hierarchical filtering
             try:
-                scope_chain = get_item_path(scope)
+                scope_chain = await asyncio.to_thread(get_item_path, scope)
                 query_filters.append(In(Variable.scope, scope_chain + [None]))
             except Exception:
                 # If scope is invalid, just filter by exact scope
@@ -138,7 +144,7 @@ async def create_variable(
 
     if body.scope:
         try:
-            get_drive_item_metadata(body.scope)
+            await get_drive_item_metadata_async(body.scope)
         except Exception:
             raise HTTPException(
                 status_code=404, detail="Scope does not exist in Google Drive"
@@ -196,7 +202,7 @@ async def get_variables_schema(
 
     if scope:
         try:
-            scope_chain = get_item_path(scope)
+            scope_chain = await asyncio.to_thread(get_item_path, scope)
         except Exception:
             scope_chain = [scope]
 
@@ -268,7 +274,7 @@ async def update_variables_schema(
 
     if body.scope:
         try:
-            get_drive_item_metadata(body.scope)
+            await get_drive_item_metadata_async(body.scope)
         except Exception:
             raise HTTPException(
                 status_code=404, detail="Scope does not exist in Google Drive"
@@ -561,9 +567,7 @@ async def batch_save_variables(
 
         if variable.validation_schema:
             try:
-                jsonschema.validate(
-                    instance=item.value, schema=variable.validation_schema
-                )
+                validate_against_schema(item.value, variable.validation_schema)
             except JsonSchemaValidationError as e:
                 errors[str(item.id)] = f"Validation error: {e.message}"
 
@@ -711,7 +715,7 @@ async def update_variable(
     scope = update_data.get("scope", existing.scope)
     if scope is not None:
         try:
-            get_drive_item_metadata(scope)
+            await get_drive_item_metadata_async(scope)
         except Exception:
             raise HTTPException(
                 status_code=404,
@@ -802,7 +806,7 @@ async def validate_variable_value(
 
     # Validate value against schema
     try:
-        jsonschema.validate(instance=body.value, schema=variable.validation_schema)
+        validate_against_schema(body.value, variable.validation_schema)
         return DetailResponse(detail="Validation successful")
     except JsonSchemaValidationError as e:
         return JSONResponse(
@@ -855,7 +859,7 @@ async def save_variable_value(
     # Validate value against schema if schema exists
     if variable.validation_schema:
         try:
-            jsonschema.validate(instance=body.value, schema=variable.validation_schema)
+            validate_against_schema(body.value, variable.validation_schema)
         except JsonSchemaValidationError as e:
             raise HTTPException(
                 status_code=400, detail=f"Validation error: {e.message}"
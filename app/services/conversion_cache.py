@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+
+from app.utils.temp_files import (
+    TEMP_DIR,
+    FileCache,
+    TempFileAllocator,
+    link_or_copy,
+    temp_file_allocator,
+)
+
+
+CONVERSION_CACHE_MAXSIZE = 256
+CONVERSION_CACHE_TTL_SECONDS = 3600
+
+# Like the template cache, entries live in their own directory so the periodic
+# purge of request temp files never touches them.
+conversion_file_allocator = TempFileAllocator(
+    os.path.join(TEMP_DIR, "docgen-conversions")
+)
+
+conversion_cache = FileCache(
+    CONVERSION_CACHE_MAXSIZE, CONVERSION_CACHE_TTL_SECONDS, conversion_file_allocator
+)
+_conversion_cache_lock = threading.Lock()
+
+
+def get_conversion_key(input_path: str, convert_to: str) -> tuple[str, str]:
+    """
+    Return the cache key of converting *input_path* to *convert_to*.
+
+    Conversions only depend on the input bytes and the target format, so the
+    file is identified by a (non-cryptographic use of a) BLAKE2 digest.
+    """
+    with open(input_path, "rb") as f:
+        digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16))
+
+    return digest.hexdigest(), convert_to
+
+
+def get_cached_conversion(key: tuple[str, str], ext: str) -> str | None:
+    """
+    Return a temp file holding the cached conversion for *key*, or ``None``
+    on a miss.
+
+    The file is hard-linked to the cache entry when possible, so it must be
+    treated as read-only.  The caller is responsible for releasing it.
+    """
+    with _conversion_cache_lock:
+        cached_path = conversion_cache.get(key)
+
+    if cached_path is None:
+        return None
+
+    output_path = temp_file_allocator.reserve(f".{ext}")
+
+    try:
+        link_or_copy(cached_path, output_path)
+    except FileNotFoundError:
+        # Evicted between the lookup and the copy.
+        temp_file_allocator.release(output_path)
+        return None
+
+    return output_path
+
+
+def store_conversion(key: tuple[str, str], output_path: str) -> None:
+    """
+    Keep a copy of *output_path* as the cached conversion for *key*.
+
+    Caching is best effort: failing to write the copy is not an error.
+    """
+    _, ext = os.path.splitext(output_path)
+    cached_path = conversion_file_allocator.reserve(ext)
+
+    try:
+        link_or_copy(output_path, cached_path)
+    except OSError:
+        conversion_file_allocator.release(cached_path)
+        return
+
+    with _conversion_cache_lock:
+        replaced_path = conversion_cache.pop(key, None)
+        conversion_cache[key] = cached_path
+
+    if replaced_path is not None:
+        conversion_file_allocator.release(replaced_path)
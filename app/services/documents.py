@@ -1,28 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import io
 import os
+import re
 import tempfile
-from typing import Any
+import threading
+import zipfile
+from typing import Any, Hashable
 from urllib.parse import urlparse
+from xml.etree import ElementTree
 
 import httpx
 from beanie import PydanticObjectId
+from cachetools import TTLCache
 from docx.shared import Inches, Mm, Pt
 from docxtpl import DocxTemplate, InlineImage, RichText, RichTextParagraph  # type: ignore[import-untyped]
 from fastapi import HTTPException
+from jinja2 import meta
 
 from app.constants import DOC_COMPATIBLE_MIME_TYPES
-from app.enums import MIME_TO_FORMAT, DocumentResponseFormat
+from app.enums import FORMAT_TO_MIME, MIME_TO_FORMAT, DocumentResponseFormat
 from app.schemas.google import DriveFile
 from app.services.google_drive import download_file
 from app.services.jinja import jinja_env
 from app.services.resource_limits import run_with_limits, validate_file_size
 from app.services.soffice import convert_file
+from app.services.template_cache import get_cached_template, store_template
 from app.services.variables import (
     get_effective_variables_for_document,
     resolve_variables_for_generation,
 )
 from app.settings import settings
+from app.utils.temp_files import TEMP_DIR, temp_file_allocator, unlink_quiet
 
 # Mapping of every accepted string representation to the python-docx length
 # class.  The lookup is performed on the lower-cased, stripped user input so
@@ -154,7 +165,7 @@ def _fetch_image_to_temp(url: str) -> str:
     fetch_timeout = settings.MAX_IMAGE_FETCH_TIME
     max_size = settings.MAX_IMAGE_SIZE
 
-    temp_fd, temp_path = tempfile.mkstemp(prefix="docgen_img_")
+    temp_fd, temp_path = tempfile.mkstemp(prefix="docgen_img_", dir=TEMP_DIR)
     # Close the raw file descriptor immediately; we will reopen via open().
     os.close(temp_fd)
 
@@ -217,8 +228,7 @@ def _fetch_image_to_temp(url: str) -> str:
     except Exception:
         # Guarantee the temp file is removed before re-raising.
         try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            unlink_quiet(temp_path)
         except OSError:
             pass
         raise
@@ -437,37 +447,148 @@ def _transform_context_objects(
     return {k: transform_value(v) for k, v in context.items()}
 
 
+_WORDML_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_WORDML_TEXT_TAG = f"{{{_WORDML_NAMESPACE}}}t"
+_WORDML_PARAGRAPH_TAG = f"{{{_WORDML_NAMESPACE}}}p"
+
+# Parts of the package that docxtpl renders: the body plus every header and
+# footer.
+_TEMPLATE_PART_PATTERN = re.compile(r"word/(?:document|header\d*|footer\d*)\.xml")
+
+# docxtpl-specific tag forms rewritten to plain Jinja2 before parsing, mirroring
+# what ``DocxTemplate.patch_xml`` does to the raw XML.
+_DOCXTPL_TAG_PATTERN = re.compile(r"([{][{%#])(?:tr|tc|p|r)\s")
+_DOCXTPL_CELL_TAG_PATTERN = re.compile(r"{%\s*(?:colspan|cellbg)\s+(.*?)%}", re.DOTALL)
+_DOCXTPL_MERGE_TAG_PATTERN = re.compile(r"{%\s*(?:vm|hm)\s*%}")
+_SMART_QUOTES = str.maketrans(
+    {"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"'}
+)
+
+
+def _extract_part_text(part: Any) -> str:
+    """Concatenate the ``w:t`` text of an XML part, one line per paragraph."""
+    paragraphs: list[str] = []
+    runs: list[str] = []
+
+    for _, element in ElementTree.iterparse(part):
+        if element.tag == _WORDML_TEXT_TAG:
+            if element.text:
+                runs.append(element.text)
+        elif element.tag == _WORDML_PARAGRAPH_TAG:
+            paragraphs.append("".join(runs))
+            runs.clear()
+            element.clear()
+
+    paragraphs.append("".join(runs))
+    return "\n".join(paragraphs)
+
+
+def fast_extract_variables(docx_path: str) -> set[str]:
+    """
+    Return the undeclared Jinja2 variables of the template at *docx_path*.
+
+    Only the text of the body, header and footer parts is streamed out of the
+    zip archive, so the python-docx object model is never built.  The result
+    matches ``DocxTemplate.get_undeclared_template_variables``.
+    """
+    chunks: list[str] = []
+
+    with zipfile.ZipFile(docx_path) as archive:
+        for name in archive.namelist():
+            if not _TEMPLATE_PART_PATTERN.fullmatch(name):
+                continue
+
+            data = archive.read(name)
+
+            # Every Jinja2 tag contains "{", so parts without one (typically
+            # most headers and footers) need no XML parsing at all.
+            if b"{" in data:
+                chunks.append(_extract_part_text(io.BytesIO(data)))
+
+    source = "\n".join(chunks).translate(_SMART_QUOTES)
+    source = _DOCXTPL_TAG_PATTERN.sub(r"\1 ", source)
+    source = _DOCXTPL_CELL_TAG_PATTERN.sub(r"{{ \1 }}", source)
+    source = _DOCXTPL_MERGE_TAG_PATTERN.sub("", source)
+
+    return meta.find_undeclared_variables(jinja_env.parse(source))
+
+
 def _get_template_variables_worker(docx_path: str) -> set[str]:
     """
     Worker: extract undeclared Jinja2 variables from *docx_path*.
     Executed inside a resource-limited child process.
     """
-    doc = DocxTemplate(docx_path)
-    variables: set[str] = doc.get_undeclared_template_variables(jinja_env)
+    return fast_extract_variables(docx_path)
+
+
+# Template variables only change when the template does, so they are cached
+# per (Drive id, modifiedTime).
+template_variables_cache: TTLCache[Hashable, frozenset[str]] = TTLCache(
+    maxsize=1024, ttl=3600
+)
+_template_variables_lock = threading.Lock()
+
+
+def _get_template_variables_key(document: DriveFile) -> tuple[str, str]:
+    return document.id, document.modified_time.isoformat()
+
+
+def _get_cached_template_variables(document: DriveFile) -> set[str] | None:
+    with _template_variables_lock:
+        cached_variables = template_variables_cache.get(
+            _get_template_variables_key(document)
+        )
+
+    return None if cached_variables is None else set(cached_variables)
+
+
+def extract_template_variables(document: DriveFile, docx_path: str) -> set[str]:
+    """
+    Return the undeclared variables of *document*, whose template has been
+    downloaded to *docx_path*, extracting them in a resource-limited
+    subprocess on a cache miss.
+    """
+    cached_variables = _get_cached_template_variables(document)
+    if cached_variables is not None:
+        return cached_variables
+
+    key = _get_template_variables_key(document)
+    variables: set[str] = run_with_limits(
+        _get_template_variables_worker, docx_path, timeout=30
+    )
+
+    with _template_variables_lock:
+        template_variables_cache[key] = frozenset(variables)
+
     return variables
 
 
 def get_template_variables(document: DriveFile) -> set[str]:
     """
     Return the set of undeclared variable names present in *document*'s
-    template.  The extraction runs inside a resource-limited subprocess.
+    template.  The extraction runs inside a resource-limited subprocess;
+    cached results skip both the download and the extraction.
     """
+    cached_variables = _get_cached_template_variables(document)
+    if cached_variables is not None:
+        return cached_variables
+
     docx_path = download_docx_document(document)
 
     try:
-        return run_with_limits(_get_template_variables_worker, docx_path, timeout=30)
+        return extract_template_variables(document, docx_path)
     finally:
-        if os.path.exists(docx_path):
-            os.remove(docx_path)
+        temp_file_allocator.release(docx_path)
 
 
 def _render_document_worker(
     docx_path: str,
     context: dict[str, Any],
-) -> str:
+    output_path: str,
+) -> None:
     """
     Worker: render the docxtpl template at *docx_path* with *context* and
-    return the path to the rendered ``.docx`` file.
+    save the rendered ``.docx`` file to *output_path*.
 
     Executed inside a resource-limited child process.  All temporary image
     files created during context transformation are collected in
@@ -484,12 +605,7 @@ def _render_document_worker(
     try:
         enriched_context = _transform_context_objects(context, doc, temp_image_paths)
         doc.render(enriched_context, jinja_env, autoescape=True)
-
-        rendered_fd, rendered_path = tempfile.mkstemp(suffix=".docx")
-        os.close(rendered_fd)
-        doc.save(rendered_path)
-
-        return rendered_path
+        doc.save(output_path)
 
     finally:
         # Always attempt to remove every image temp file, regardless of whether
@@ -497,8 +613,7 @@ def _render_document_worker(
         # so they cannot mask the original exception.
         for path in temp_image_paths:
             try:
-                if os.path.exists(path):
-                    os.remove(path)
+                unlink_quiet(path)
             except OSError:
                 pass
 
@@ -507,6 +622,10 @@ def download_docx_document(document: DriveFile) -> str:
     """
     Download *document* from Google Drive as a ``.docx`` file.
 
+    Templates are cached by Drive id and modification time, so repeated
+    requests for an unchanged template skip both the download and the
+    conversion.  The returned file must be treated as read-only.
+
     The caller is responsible for deleting the returned path.
 
     Raises :class:`~app.services.resource_limits.ResourceLimitError` when
@@ -514,6 +633,17 @@ def download_docx_document(document: DriveFile) -> str:
     """
     validate_file_size(document.size)
 
+    cached_path = get_cached_template(document)
+    if cached_path:
+        return cached_path
+
+    docx_path = _download_docx_document(document)
+    store_template(document, docx_path)
+
+    return docx_path
+
+
+def _download_docx_document(document: DriveFile) -> str:
     download_mime_type: str | None = None
 
     if document.mime_type == "application/vnd.google-apps.document":
@@ -526,26 +656,47 @@ def download_docx_document(document: DriveFile) -> str:
         if not extension:
             extension = ".docx"
 
-    temp_path: str | None = None
-    temp_fd, temp_path = tempfile.mkstemp(suffix=extension)
+    temp_path = temp_file_allocator.create(extension)
+    owned_by_caller = False
 
     try:
-        with os.fdopen(temp_fd, "wb") as f:
+        with open(temp_path, "wb") as f:
             download_file(document.id, f, download_mime_type, document.size)
 
         if document.mime_type in {
             "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             "application/vnd.google-apps.document",
         }:
-            docx_path = temp_path
-            temp_path = None  # ownership transferred to caller
-            return docx_path
+            owned_by_caller = True  # ownership transferred to caller
+            return temp_path
 
         return convert_file(temp_path, "docx")
 
     finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+        if not owned_by_caller:
+            temp_file_allocator.release(temp_path)
+
+
+def prefetch_docx(document: DriveFile) -> asyncio.Task[str]:
+    """
+    Start downloading *document* as a ``.docx`` file in a worker thread.
+
+    Lets the download overlap with work done before rendering.  A task that
+    will not be consumed must be passed to :func:`discard_docx_prefetch`.
+    """
+    return asyncio.create_task(asyncio.to_thread(download_docx_document, document))
+
+
+def _release_prefetched_docx(task: asyncio.Task[str]) -> None:
+    if not task.cancelled() and task.exception() is None:
+        temp_file_allocator.release(task.result())
+
+
+def discard_docx_prefetch(task: asyncio.Task[str]) -> None:
+    """Release the file downloaded by an unused :func:`prefetch_docx` task."""
+    # The download thread cannot be interrupted, so let it finish and clean
+    # up once it does.
+    task.add_done_callback(_release_prefetched_docx)
 
 
 def download_template_as_format(
@@ -555,50 +706,29 @@ def download_template_as_format(
     """
     Download the template in *format* without filling any variables.
 
-    For Google Docs, a direct export is used when possible (PDF/DOCX) to
-    avoid unnecessary LibreOffice round-trips.
+    Google Docs are exported by Drive directly in *format* to avoid
+    unnecessary LibreOffice round-trips; other documents go through DOCX and
+    soffice.
 
     The caller is responsible for deleting the returned path.
     """
     validate_file_size(document.size)
 
     if document.mime_type == "application/vnd.google-apps.document":
-        if format == DocumentResponseFormat.PDF:
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".pdf")
-            try:
-                with os.fdopen(temp_fd, "wb") as f:
-                    download_file(document.id, f, "application/pdf", document.size)
-                return temp_path
-            except Exception:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                raise
-        else:
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".docx")
-            try:
-                with os.fdopen(temp_fd, "wb") as f:
-                    download_file(
-                        document.id,
-                        f,
-                        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                        document.size,
-                    )
-                return temp_path
-            except Exception:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                raise
-    else:
-        docx_path = download_docx_document(document)
+        with temp_file_allocator.acquire(f".{format.value}") as temp_path:
+            with open(temp_path, "wb") as f:
+                download_file(document.id, f, FORMAT_TO_MIME[format], document.size)
+        return temp_path
 
-        if format == DocumentResponseFormat.DOCX:
-            return docx_path
+    docx_path = download_docx_document(document)
 
-        try:
-            return convert_file(docx_path, format.value)
-        finally:
-            if os.path.exists(docx_path):
-                os.remove(docx_path)
+    if format == DocumentResponseFormat.DOCX:
+        return docx_path
+
+    try:
+        return convert_file(docx_path, format.value)
+    finally:
+        temp_file_allocator.release(docx_path)
 
 
 async def get_document_variables_info(
@@ -612,7 +742,7 @@ async def get_document_variables_info(
     *variables_info* maps each variable name to its database configuration
     (value, schema, required flag, saved value, …).
     """
-    template_variables = get_template_variables(document)
+    template_variables = await asyncio.to_thread(get_template_variables, document)
 
     variables_info = await get_effective_variables_for_document(
         document.id, template_variables, user_id, file_parent
@@ -626,10 +756,15 @@ async def validate_variables_for_document(
     user_variables: dict[str, Any],
     user_id: PydanticObjectId | None = None,
     bypass_validation: bool = False,
+    *,
+    template_variables: set[str] | None = None,
 ) -> None:
     """
     Validate *user_variables* against the template's variable definitions.
 
+    Callers that already know the template's variables can pass them as
+    *template_variables* to skip looking them up.
+
     Raises :class:`~app.exceptions.ValidationErrorsException` when one or
     more variables fail validation.  Does nothing when *bypass_validation* is
     ``True``.
@@ -637,7 +772,8 @@ async def validate_variables_for_document(
     if bypass_validation:
         return
 
-    template_variables = get_template_variables(document)
+    if template_variables is None:
+        template_variables = await asyncio.to_thread(get_template_variables, document)
 
     await resolve_variables_for_generation(
         document.id,
@@ -658,45 +794,73 @@ async def generate_document(
     """
     Generate a filled document and return ``(output_path, final_context)``.
 
+    When the template's variables are cached, they are resolved while the
+    template is being downloaded.
+
     The output file must be deleted by the caller (typically via a FastAPI
     background task).
     """
-    docx_path = download_docx_document(document)
-    rendered_path: str | None = None
+    docx_task = prefetch_docx(document)
+    context: dict[str, Any] | None = None
 
     try:
-        template_variables = run_with_limits(
-            _get_template_variables_worker, docx_path, timeout=30
-        )
+        template_variables = _get_cached_template_variables(document)
+        if template_variables is not None:
+            context = await resolve_variables_for_generation(
+                document.id,
+                template_variables,
+                user_variables,
+                user_id,
+                bypass_validation,
+            )
 
-        context = await resolve_variables_for_generation(
-            document.id,
-            template_variables,
-            user_variables,
-            user_id,
-            bypass_validation,
-        )
+        docx_path = await asyncio.shield(docx_task)
+    except BaseException:
+        discard_docx_prefetch(docx_task)
+        raise
 
-        rendered_path = run_with_limits(
-            _render_document_worker, docx_path, context, timeout=30
+    # Reserved here rather than in the worker so the file is released even
+    # if the worker dies after writing it.
+    rendered_path = temp_file_allocator.reserve(".docx")
+    output_path: str | None = None
+
+    try:
+        if context is None:
+            template_variables = await asyncio.to_thread(
+                extract_template_variables, document, docx_path
+            )
+
+            context = await resolve_variables_for_generation(
+                document.id,
+                template_variables,
+                user_variables,
+                user_id,
+                bypass_validation,
+            )
+
+        await asyncio.to_thread(
+            run_with_limits,
+            _render_document_worker,
+            docx_path,
+            context,
+            rendered_path,
+            timeout=30,
         )
 
         if format == DocumentResponseFormat.DOCX:
-            return rendered_path, context
+            output_path = rendered_path
+        else:
+            output_path = await asyncio.to_thread(
+                convert_file, rendered_path, format.value
+            )
 
-        converted_path = convert_file(rendered_path, format.value)
-        return converted_path, context
+        return output_path, context
 
     finally:
-        if docx_path and os.path.exists(docx_path):
-            os.remove(docx_path)
+        temp_file_allocator.release(docx_path)
 
-        if (
-            format != DocumentResponseFormat.DOCX
-            and rendered_path
-            and os.path.exists(rendered_path)
-        ):
-            os.remove(rendered_path)
+        if output_path != rendered_path:
+            temp_file_allocator.release(rendered_path)
 
 
 def validate_document_generation_request(variables: dict[str, Any]) -> None:
@@ -720,6 +884,19 @@ def validate_document_mime_type(mime_type: str) -> None:
         )
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_accept(accept: str) -> DocumentResponseFormat | None:
+    """Return the first supported format listed in an ``Accept`` header."""
+    mime_to_format = MIME_TO_FORMAT.get
+
+    for mime in accept.split(","):
+        accepted_format = mime_to_format(mime.split(";")[0].strip())
+        if accepted_format:
+            return accepted_format
+
+    return None
+
+
 def resolve_format(
     accept: str | None,
     format: DocumentResponseFormat | None,
@@ -729,10 +906,9 @@ def resolve_format(
     parameter, falling back to PDF.
     """
     if accept:
-        for mime in accept.split(","):
-            mime = mime.split(";")[0].strip()
-            if mime in MIME_TO_FORMAT:
-                return MIME_TO_FORMAT[mime]
+        accepted_format = _parse_accept(accept)
+        if accepted_format:
+            return accepted_format
 
     if format:
         return format
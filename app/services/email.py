@@ -4,6 +4,27 @@ from typing import Literal
 from app.settings import settings
 
 
+# Shared so consecutive emails reuse the keep-alive connection to the mailer.
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=20))
+
+    return _client
+
+
+async def close_email_client() -> None:
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 async def send_email(
     to_email: str,
     subject: str,
@@ -20,6 +41,7 @@ async def send_email(
         "url": url,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(settings.MAILER_URL, json=payload, headers=headers)
-        response.raise_for_status()
+    response = await _get_client().post(
+        settings.MAILER_URL, json=payload, headers=headers
+    )
+    response.raise_for_status()
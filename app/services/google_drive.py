@@ -1,42 +1,88 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, BinaryIO, Hashable
-from cachetools import TTLCache, cached
+import functools
+import sys
+import threading
+import time
+from typing import Any, BinaryIO, Hashable, Iterator
+from cachetools import LRUCache, TTLCache, cached
+from cachetools.keys import hashkey
 from fastapi import HTTPException
+import httpx
+from google_auth_httplib2 import AuthorizedHttp, Request as AuthRequest  # type: ignore[import-untyped]
 from googleapiclient.discovery import build  # type: ignore[import-untyped]
-from googleapiclient.http import MediaIoBaseDownload  # type: ignore[import-untyped]
+from googleapiclient.errors import HttpError  # type: ignore[import-untyped]
+from googleapiclient.http import build_http  # type: ignore[import-untyped]
 
 from app.constants import (
     CHUNK_DOWNLOAD_THRESHOLD,
+    DOWNLOAD_CHUNK_SIZE,
     DOC_COMPATIBLE_MIME_TYPES,
     DRIVE_FOLDER_MIME_TYPE,
+    DRIVE_HTTP_TIMEOUT,
     MAX_DOWNLOAD_RETRIES,
+    MAX_DRIVE_LIST_RETRIES,
+    RETRYABLE_STATUS_CODES,
 )
 from app.schemas.google import DriveFile, DriveFolder
 from app.google_credentials import credentials
 from app.services.resource_limits import validate_file_size
 
+try:
+    # C parser, several times faster than fromisoformat; handles "Z" itself
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:  # pragma: no cover
+    _parse_iso_datetime = datetime.fromisoformat  # type: ignore[assignment]
 
-drive_client = build("drive", "v3", credentials=credentials)
+
+# httplib2 connections are not thread-safe, so every thread that talks to
+# Drive (the event loop and any worker threads) gets a client of its own.
+_thread_local = threading.local()
 
 folder_graph_cache: TTLCache[Hashable, dict[str, Any]] = TTLCache(maxsize=1, ttl=60)
 files_and_folders_cache: TTLCache[Hashable, list[dict[str, Any]]] = TTLCache(
     maxsize=1, ttl=60
 )
 drive_metadata_cache: TTLCache[Hashable, dict[str, Any]] = TTLCache(
-    maxsize=1024, ttl=60
+    maxsize=4096, ttl=60
+)
+# Drive lookups run both on the event loop and in worker threads
+_listing_cache_lock = threading.Lock()
+drive_metadata_cache_lock = threading.Lock()
+# Paths expire together with the folder graph they are walked from, so a
+# moved item is never located by a stale path for longer than the graph.
+item_path_cache: TTLCache[Hashable, tuple[str, ...]] = TTLCache(maxsize=10_000, ttl=60)
+folder_path_cache: TTLCache[Hashable, tuple[str, ...]] = TTLCache(
+    maxsize=10_000, ttl=60
 )
+_path_cache_lock = threading.Lock()
+drive_file_cache: LRUCache[Hashable, DriveFile] = LRUCache(maxsize=8192)
+drive_folder_cache: LRUCache[Hashable, DriveFolder] = LRUCache(maxsize=8192)
 
 
-def get_results_by_query(
+def get_drive_client() -> Any:
+    """Return the Drive API client of the calling thread."""
+    client = getattr(_thread_local, "drive_client", None)
+
+    if client is None:
+        http = AuthorizedHttp(credentials, http=build_http())
+        client = build("drive", "v3", http=http, cache_discovery=False)
+        _thread_local.drive_client = client
+
+    return client
+
+
+def iter_results_by_query(
     query: str,
     fields: str = "nextPageToken, files(id, name, mimeType, parents, modifiedTime, createdTime, webViewLink, size)",
-) -> list[dict[str, Any]]:
-    results = []
+) -> Iterator[dict[str, Any]]:
+    """Yield the items matching *query*, fetching one page at a time."""
     page_token = None
 
     while True:
         response = (
-            drive_client.files()
+            get_drive_client()
+            .files()
             .list(
                 q=query,
                 spaces="drive",
@@ -46,73 +92,215 @@ def get_results_by_query(
             )
             .execute()
         )
-        results.extend(response.get("files", []))
+        yield from response.get("files", ())
         page_token = response.get("nextPageToken")
         if not page_token:
             break
 
-    return results
 
+def get_results_by_query(
+    query: str,
+    fields: str = "nextPageToken, files(id, name, mimeType, parents, modifiedTime, createdTime, webViewLink, size)",
+) -> list[dict[str, Any]]:
+    return list(iter_results_by_query(query, fields))
+
+
+def _collect_list_response(
+    responses: dict[str, dict[str, Any]],
+    errors: list[Exception],
+    retry_delays: list[float],
+    attempt: int,
+    request_id: str,
+    response: Any,
+    exception: Any,
+) -> None:
+    """Batch callback of :func:`get_results_by_queries`, bound per round."""
+    if exception is None:
+        responses[request_id] = response
+    elif _is_retryable(exception) and attempt < MAX_DRIVE_LIST_RETRIES:
+        retry_delays.append(
+            _get_retry_delay(exception.resp.get("retry-after"), attempt)
+        )
+    else:
+        errors.append(exception)
+
+
+def get_results_by_queries(
+    queries: list[str],
+    fields: str = "nextPageToken, files(id, name, mimeType, parents, modifiedTime, createdTime, webViewLink, size)",
+) -> list[dict[str, Any]]:
+    """
+    Run several list queries, sending each round of page requests as a
+    single HTTP batch.  Items matched by more than one query are returned
+    once.
 
-def get_accessible_folders() -> list[dict[str, Any]]:
-    return get_results_by_query(
-        "mimeType='application/vnd.google-apps.folder' and trashed=false"
+    Sub-requests that are rate limited or hit a server error are retried
+    with exponential backoff, honouring ``Retry-After``.
+    """
+    client = get_drive_client()
+    results: dict[str, dict[str, Any]] = {}
+    page_tokens: dict[str, str | None] = dict.fromkeys(queries)
+    attempt = 0
+
+    while page_tokens:
+        responses: dict[str, dict[str, Any]] = {}
+        errors: list[Exception] = []
+        retry_delays: list[float] = []
+
+        collect = functools.partial(
+            _collect_list_response, responses, errors, retry_delays, attempt
+        )
+
+        pending_queries = list(page_tokens)
+        batch = client.new_batch_http_request(callback=collect)
+        for i, (query, page_token) in enumerate(page_tokens.items()):
+            batch.add(
+                client.files().list(
+                    q=query,
+                    spaces="drive",
+                    fields=fields,
+                    pageToken=page_token,
+                    pageSize=1000,
+                ),
+                request_id=str(i),
+            )
+        batch.execute()
+
+        if errors:
+            raise errors[0]
+
+        # Throttled or failed sub-requests keep their page token and go out
+        # again in the next round.
+        next_page_tokens: dict[str, str | None] = {
+            query: page_tokens[query]
+            for i, query in enumerate(pending_queries)
+            if str(i) not in responses
+        }
+        for request_id, response in responses.items():
+            query = pending_queries[int(request_id)]
+
+            for item in response.get("files", []):
+                results.setdefault(item["id"], item)
+
+            next_page_token = response.get("nextPageToken")
+            if next_page_token:
+                next_page_tokens[query] = next_page_token
+
+        if retry_delays:
+            time.sleep(max(retry_delays))
+            attempt += 1
+        else:
+            attempt = 0
+
+        page_tokens = next_page_tokens
+
+    return list(results.values())
+
+
+def _is_retryable(exception: Exception) -> bool:
+    return (
+        isinstance(exception, HttpError)
+        and exception.resp.status in RETRYABLE_STATUS_CODES
     )
 
 
-@cached(files_and_folders_cache)
-def get_accessible_files_and_folders() -> list[dict[str, Any]]:
-    mime_types_query = " or ".join(
-        [f"mimeType='{mime}'" for mime in DOC_COMPATIBLE_MIME_TYPES]
+def _get_retry_delay(retry_after: str | None, attempt: int) -> float:
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+
+    return float(2**attempt)
+
+
+FOLDERS_QUERY = f"mimeType='{DRIVE_FOLDER_MIME_TYPE}' and trashed=false"
+
+# One query per MIME type, all sent in the same batch round-trip
+FILES_AND_FOLDERS_QUERIES = [
+    f"mimeType='{mime}' and trashed=false" for mime in sorted(DOC_COMPATIBLE_MIME_TYPES)
+] + [FOLDERS_QUERY]
+
+
+def get_accessible_folders() -> Iterator[dict[str, Any]]:
+    # Only used to build the folder graph, which needs nothing else and
+    # consumes the listing a page at a time
+    return iter_results_by_query(
+        FOLDERS_QUERY,
+        fields="nextPageToken, files(id, name, parents)",
     )
-    mime_types_query += " or mimeType='application/vnd.google-apps.folder'"
 
-    return get_results_by_query(f"({mime_types_query}) and trashed=false")
 
+@cached(files_and_folders_cache, lock=_listing_cache_lock)
+def get_accessible_files_and_folders() -> list[dict[str, Any]]:
+    return get_results_by_queries(FILES_AND_FOLDERS_QUERIES)
 
-@cached(folder_graph_cache)
+
+@cached(folder_graph_cache, lock=_listing_cache_lock)
 def get_folder_graph() -> dict[str, Any]:
     folders = get_accessible_folders()
 
     graph = {}
+    children: defaultdict[str, list[str]] = defaultdict(list)
 
+    # Drive ids are unique, so children lists need no deduplication. Nodes
+    # share the lists in `children`, which later folders keep filling. Ids
+    # are interned so the copies in parent lists share one string.
     for f in folders:
-        graph[f["id"]] = {
-            "id": f["id"],
+        folder_id = sys.intern(f["id"])
+        parents = [sys.intern(parent_id) for parent_id in f.get("parents", [])]
+
+        for parent_id in parents:
+            children[parent_id].append(folder_id)
+
+        graph[folder_id] = {
+            "id": folder_id,
             "name": f["name"],
-            "parents": f.get("parents", []),
-            "children": set(),
+            "parents": parents,
+            "children": children[folder_id],
         }
 
-    for folder_id, node in graph.items():
-        for parent_id in node["parents"]:
-            if parent_id in graph:
-                graph[parent_id]["children"].add(folder_id)
-
     return graph
 
 
-def get_folder_path(folder_id: str) -> list[str]:
-    graph = get_folder_graph()
-
-    path: list[str] = []
-    current_id = folder_id
+def _walk_to_root(graph: dict[str, Any], start_id: str, path: list[str]) -> None:
+    """
+    Append *start_id* and its first-parent ancestors found in *graph* to
+    *path*, stopping at the root or, should Drive report a parent cycle, at
+    the first folder seen twice.
+    """
+    visited: set[str] = set()
+    current_id = start_id
 
-    while current_id in graph:
+    while current_id in graph and current_id not in visited:
+        visited.add(current_id)
         path.append(current_id)
-        node = graph[current_id]
-        parents = node.get("parents", [])
+        parents = graph[current_id]["parents"]
         if not parents:
             break
 
         current_id = parents[0]
 
+
+def get_folder_path(folder_id: str) -> list[str]:
+    return list(_resolve_folder_path(folder_id))
+
+
+@cached(folder_path_cache, lock=_path_cache_lock)
+def _resolve_folder_path(folder_id: str) -> tuple[str, ...]:
+    path: list[str] = []
+    _walk_to_root(get_folder_graph(), folder_id, path)
     path.reverse()
 
-    return path
+    return tuple(path)
 
 
 def get_item_path(item_id: str, file_parent: str | None = None) -> list[str]:
+    return list(_resolve_item_path(item_id, file_parent))
+
+
+@cached(item_path_cache, lock=_path_cache_lock)
+def _resolve_item_path(item_id: str, file_parent: str | None) -> tuple[str, ...]:
     graph = get_folder_graph()
 
     path: list[str] = []
@@ -123,35 +311,21 @@ def get_item_path(item_id: str, file_parent: str | None = None) -> list[str]:
         current_id = file_parent
         path.append(item_id)
     else:
-        # Probably a file
-        metadata: dict[str, Any] = (
-            drive_client.files()
-            .get(
-                fileId=item_id,
-                fields="parents",
-            )
-            .execute()
-        )
+        # Probably a file. Reuse the cached metadata so an access check that
+        # already fetched it does not pay for a second round-trip.
+        metadata = get_drive_item_metadata(item_id)
 
         parents = metadata.get("parents", [])
         if not parents:
-            return [item_id]
+            return (item_id,)
 
         current_id = parents[0]
         path.append(item_id)
 
-    while current_id in graph:
-        path.append(current_id)
-        node = graph[current_id]
-        parents = node.get("parents", [])
-        if not parents:
-            break
-
-        current_id = parents[0]
-
+    _walk_to_root(graph, current_id, path)
     path.reverse()
 
-    return path
+    return tuple(path)
 
 
 def ensure_folder(mime_type: str) -> None:
@@ -162,6 +336,42 @@ def ensure_folder(mime_type: str) -> None:
         )
 
 
+# Media is streamed with httpx rather than httplib2. httpx clients are
+# thread-safe, so every thread shares one connection pool; the httplib2
+# transport used for token refreshes is not, hence the lock.
+_media_client = httpx.Client(follow_redirects=True, timeout=DRIVE_HTTP_TIMEOUT)
+_auth_request = AuthRequest(build_http())
+_auth_request_lock = threading.Lock()
+
+
+def _stream_media(uri: str, out: BinaryIO) -> None:
+    """
+    Stream the media at *uri* into *out* with a single GET, retrying
+    rate-limit and server errors.
+    """
+    for attempt in range(MAX_DOWNLOAD_RETRIES + 1):
+        headers: dict[str, str] = {}
+        with _auth_request_lock:
+            credentials.before_request(_auth_request, "GET", uri, headers)
+
+        with _media_client.stream("GET", uri, headers=headers) as response:
+            if (
+                response.status_code in RETRYABLE_STATUS_CODES
+                and attempt < MAX_DOWNLOAD_RETRIES
+            ):
+                time.sleep(
+                    _get_retry_delay(response.headers.get("retry-after"), attempt)
+                )
+                continue
+
+            response.raise_for_status()
+
+            for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                out.write(chunk)
+
+            return
+
+
 def download_file(
     file_id: str,
     out: BinaryIO,
@@ -183,42 +393,108 @@ def download_file(
     validate_file_size(file_size)
 
     if export_mime_type:
-        request = drive_client.files().export_media(
-            fileId=file_id, mimeType=export_mime_type
+        request = (
+            get_drive_client()
+            .files()
+            .export_media(fileId=file_id, mimeType=export_mime_type)
         )
     else:
-        request = drive_client.files().get_media(fileId=file_id)
+        request = get_drive_client().files().get_media(fileId=file_id)
 
     use_chunks = not file_size or file_size >= CHUNK_DOWNLOAD_THRESHOLD
 
     if use_chunks:
-        downloader = MediaIoBaseDownload(out, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk(MAX_DOWNLOAD_RETRIES)
+        _stream_media(request.uri, out)
     else:
         file_content: bytes = request.execute()
         out.write(file_content)
 
 
-@cached(drive_metadata_cache)
+DRIVE_ITEM_METADATA_FIELDS = (
+    "id, name, mimeType, modifiedTime, createdTime, webViewLink, size, parents"
+)
+DRIVE_BATCH_MAX_REQUESTS = 100
+
+
+@cached(drive_metadata_cache, lock=drive_metadata_cache_lock)
 def get_drive_item_metadata(file_id: str) -> dict[str, Any]:
     metadata: dict[str, Any] = (
-        drive_client.files()
-        .get(
-            fileId=file_id,
-            fields="id, name, mimeType, modifiedTime, createdTime, webViewLink, size, parents",
-        )
+        get_drive_client()
+        .files()
+        .get(fileId=file_id, fields=DRIVE_ITEM_METADATA_FIELDS)
         .execute()
     )
 
     return metadata
 
 
+def get_drive_items_metadata(file_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Fetch metadata of several items, sending the cache misses as HTTP
+    batches of up to ``DRIVE_BATCH_MAX_REQUESTS`` requests.
+
+    Fetched items are added to the metadata cache.  Items that cannot be
+    fetched are left out of the result.
+    """
+    results: dict[str, dict[str, Any]] = {}
+    missing: list[str] = []
+
+    for file_id in dict.fromkeys(file_ids):
+        with drive_metadata_cache_lock:
+            metadata = drive_metadata_cache.get(hashkey(file_id))
+        if metadata is None:
+            missing.append(file_id)
+        else:
+            results[file_id] = metadata
+
+    if not missing:
+        return results
+
+    client = get_drive_client()
+
+    def collect(request_id: str, response: Any, exception: Any) -> None:
+        if exception is None:
+            results[request_id] = response
+            with drive_metadata_cache_lock:
+                drive_metadata_cache[hashkey(request_id)] = response
+
+    for start in range(0, len(missing), DRIVE_BATCH_MAX_REQUESTS):
+        batch = client.new_batch_http_request(callback=collect)
+        for file_id in missing[start : start + DRIVE_BATCH_MAX_REQUESTS]:
+            batch.add(
+                client.files().get(fileId=file_id, fields=DRIVE_ITEM_METADATA_FIELDS),
+                request_id=file_id,
+            )
+        batch.execute()
+
+    return results
+
+
+# Items changed together share timestamps, so listings repeat them often
+@functools.lru_cache(maxsize=8192)
 def parse_google_datetime(date_str: str) -> datetime:
-    return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    return _parse_iso_datetime(date_str)
+
+
+def _get_item_format_key(item_data: dict[str, Any]) -> tuple[Any, ...]:
+    # Renames and moves do not change modifiedTime, so the key carries every
+    # field that can change
+    parents = item_data.get("parents")
+
+    return (
+        item_data["id"],
+        item_data["modifiedTime"],
+        item_data["name"],
+        item_data["mimeType"],
+        parents[0] if parents else None,
+        item_data.get("size"),
+        item_data.get("webViewLink"),
+    )
 
 
+# The same items show up in listing after listing; the models built from
+# them are never mutated, so they can be shared.
+@cached(drive_file_cache, key=_get_item_format_key)
 def format_drive_file_metadata(file_data: dict[str, Any]) -> DriveFile:
     created_time = parse_google_datetime(file_data["createdTime"])
     modified_time = parse_google_datetime(file_data["modifiedTime"])
@@ -239,6 +515,7 @@ def format_drive_file_metadata(file_data: dict[str, Any]) -> DriveFile:
     )
 
 
+@cached(drive_folder_cache, key=_get_item_format_key)
 def format_drive_folder_metadata(folder_data: dict[str, Any]) -> DriveFolder:
     created_time = parse_google_datetime(folder_data["createdTime"])
     modified_time = parse_google_datetime(folder_data["modifiedTime"])
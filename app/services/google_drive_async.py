@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, BinaryIO
+
+import httpx
+from cachetools.keys import hashkey
+from google_auth_httplib2 import Request as AuthRequest  # type: ignore[import-untyped]
+from googleapiclient.http import build_http  # type: ignore[import-untyped]
+
+from app.constants import (
+    DRIVE_HTTP_TIMEOUT,
+    MAX_DOWNLOAD_RETRIES,
+    RETRYABLE_STATUS_CODES,
+)
+from app.google_credentials import credentials
+from app.services.google_drive import (
+    DRIVE_ITEM_METADATA_FIELDS,
+    drive_metadata_cache,
+    drive_metadata_cache_lock,
+)
+from app.services.resource_limits import validate_file_size
+
+
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+MAX_CONCURRENT_DOWNLOADS = 8
+
+_download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+_token_lock = asyncio.Lock()
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32),
+            follow_redirects=True,
+            timeout=DRIVE_HTTP_TIMEOUT,
+        )
+
+    return _client
+
+
+async def close_drive_client() -> None:
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_access_token() -> str:
+    """Return a valid OAuth access token for the service account."""
+    async with _token_lock:
+        if not credentials.valid:
+            await asyncio.to_thread(credentials.refresh, AuthRequest(build_http()))
+
+    token: str = credentials.token
+    return token
+
+
+def _get_retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get("retry-after")
+
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+
+    return float(2**attempt)
+
+
+async def download_file_async(
+    file_id: str,
+    out: BinaryIO,
+    export_mime_type: str | None = None,
+    file_size: int | None = None,
+) -> None:
+    """
+    Download a file from Google Drive without blocking the event loop.
+
+    Same contract as :func:`app.services.google_drive.download_file`.  At
+    most ``MAX_CONCURRENT_DOWNLOADS`` downloads run at once, and rate-limit
+    or server errors are retried, honouring ``Retry-After``.
+
+    Raises:
+        ResourceLimitError: If file size exceeds MAX_FILE_DOWNLOAD_SIZE
+        httpx.HTTPStatusError: If Drive rejects the request
+    """
+    validate_file_size(file_size)
+
+    if export_mime_type:
+        url = f"{DRIVE_FILES_URL}/{file_id}/export"
+        params = {"mimeType": export_mime_type}
+    else:
+        url = f"{DRIVE_FILES_URL}/{file_id}"
+        params = {"alt": "media"}
+
+    client = _get_client()
+
+    async with _download_semaphore:
+        for attempt in range(MAX_DOWNLOAD_RETRIES + 1):
+            token = await get_access_token()
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async with client.stream(
+                "GET", url, params=params, headers=headers
+            ) as response:
+                if (
+                    response.status_code in RETRYABLE_STATUS_CODES
+                    and attempt < MAX_DOWNLOAD_RETRIES
+                ):
+                    await asyncio.sleep(_get_retry_delay(response, attempt))
+                    continue
+
+                response.raise_for_status()
+
+                async for chunk in response.aiter_bytes():
+                    out.write(chunk)
+
+                return
+
+
+async def get_drive_item_metadata_async(file_id: str) -> dict[str, Any]:
+    """
+    Fetch the metadata of a Drive item without blocking the event loop.
+
+    Shares its cache with
+    :func:`app.services.google_drive.get_drive_item_metadata`.
+
+    Raises:
+        httpx.HTTPStatusError: If Drive rejects the request
+    """
+    key = hashkey(file_id)
+    with drive_metadata_cache_lock:
+        metadata: dict[str, Any] | None = drive_metadata_cache.get(key)
+
+    if metadata is not None:
+        return metadata
+
+    token = await get_access_token()
+    response = await _get_client().get(
+        f"{DRIVE_FILES_URL}/{file_id}",
+        params={"fields": DRIVE_ITEM_METADATA_FIELDS},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response.raise_for_status()
+
+    metadata = response.json()
+    with drive_metadata_cache_lock:
+        drive_metadata_cache[key] = metadata
+
+    return metadata
@@ -1,22 +1,46 @@
+import calendar
 from datetime import datetime, timezone, tzinfo
+import functools
+import hashlib
 import json
-from typing import Any
+import os
+import re
+from typing import Any, MutableMapping
+from types import CodeType
 import uuid
 from zoneinfo import ZoneInfo
+from cachetools import LRUCache
 from lesya import Lesya, Gender  # type: ignore[import-untyped]
 
 import jinja2
+from jinja2 import nodes
+
+from app.utils.temp_files import TEMP_DIR, TempFileAllocator
+
+try:
+    # C parser, several times faster than fromisoformat
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:  # pragma: no cover
+    _parse_iso_datetime = datetime.fromisoformat  # type: ignore[assignment]
 
 
 def load_json(value: Any) -> Any:
     return json.loads(value)
 
 
+@functools.lru_cache(maxsize=64)
+def _get_zone(name: str) -> tzinfo:
+    if name in ("UTC", "Z"):
+        return timezone.utc
+
+    return ZoneInfo(name)
+
+
 def _parse_timezone(tz: str | tzinfo | None) -> tzinfo:
     if tz is None:
         return timezone.utc
     if isinstance(tz, str):
-        return ZoneInfo(tz)
+        return _get_zone(tz)
 
     return tz
 
@@ -29,9 +53,35 @@ def now(
     return datetime.now(tzinfo).strftime(fmt)
 
 
+DEFAULT_DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Strings the default format can be cut out of without parsing them
+_ISO_DATETIME_PATTERN = re.compile(
+    r"\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])"
+    r"T(?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d{1,6})?)?"
+    r"(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?"
+)
+
+
+def _is_iso_datetime(value: str) -> bool:
+    """
+    Whether *value* is a complete ISO date-time that would parse.
+
+    The pattern only checks the shape of the string, so the day is checked
+    against the length of the month here.  Years before 1000 are left to the
+    parser, since strftime does not zero-pad them on every platform.
+    """
+    if not _ISO_DATETIME_PATTERN.fullmatch(value):
+        return False
+
+    year, month, day = int(value[:4]), int(value[5:7]), int(value[8:10])
+
+    return year >= 1000 and day <= calendar.monthrange(year, month)[1]
+
+
 def format_datetime(
     value: Any,
-    fmt: str = "%Y-%m-%d %H:%M",
+    fmt: str = DEFAULT_DATETIME_FORMAT,
     tz: str | tzinfo | None = timezone.utc,
 ) -> str:
     if value in (None, ""):
@@ -39,6 +89,15 @@ def format_datetime(
 
     tzinfo = _parse_timezone(tz)
 
+    # The timezone is only attached, never converted to, so the default
+    # format of an ISO string is its date and hh:mm as written.
+    if (
+        fmt == DEFAULT_DATETIME_FORMAT
+        and isinstance(value, str)
+        and _is_iso_datetime(value)
+    ):
+        return f"{value[:10]} {value[11:16]}"
+
     # datetime input
     if isinstance(value, datetime):
         dt = value
@@ -49,10 +108,15 @@ def format_datetime(
 
     # String input
     elif isinstance(value, str):
-        try:
-            dt = datetime.fromisoformat(value)
-        except ValueError:
-            return value  # safe Jinja fallback
+        # ciso8601 also accepts strings fromisoformat rejects, such as partial
+        # dates, so it is only trusted with complete date-times.
+        if _is_iso_datetime(value):
+            dt = _parse_iso_datetime(value)
+        else:
+            try:
+                dt = datetime.fromisoformat(value)
+            except ValueError:
+                return value  # safe Jinja fallback
 
     else:
         return str(value)
@@ -123,7 +187,63 @@ def decline_uk_name(name: str, case: str = "родовий", gender: str | None
     return declined_name
 
 
-jinja_env = jinja2.Environment()
+class BytecodeCachingEnvironment(jinja2.Environment):
+    """
+    Environment whose :meth:`from_string` goes through the bytecode cache.
+
+    docxtpl compiles every XML part of a template with ``from_string``, which
+    jinja2 never caches.  Bytecode is keyed by a hash of the source and the
+    autoescape setting (it changes the generated code), so repeated renders
+    of an unchanged template skip parsing and compilation, and editing the
+    template invalidates its entry automatically.  The cache lives on disk,
+    so it is shared by the resource-limited worker processes.  Code objects
+    are additionally kept in an in-memory LRU so a process that renders the
+    same template again skips reading and unmarshalling the bucket.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.code_cache: LRUCache[str, CodeType] = LRUCache(maxsize=128)
+
+    def from_string(
+        self,
+        source: str | nodes.Template,
+        globals: MutableMapping[str, Any] | None = None,
+        template_class: type[jinja2.Template] | None = None,
+    ) -> jinja2.Template:
+        if self.bytecode_cache is None or not isinstance(source, str):
+            return super().from_string(source, globals, template_class)
+
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        key = f"{self.autoescape!r}:{digest}"
+
+        code = self.code_cache.get(key)
+        if code is None:
+            bucket = self.bytecode_cache.get_bucket(self, key, None, source)
+
+            code = bucket.code
+            if code is None:
+                code = self.compile(source)
+                bucket.code = code
+                self.bytecode_cache.set_bucket(bucket)
+
+            self.code_cache[key] = code
+
+        cls = template_class or self.template_class
+        return cls.from_code(self, code, self.make_globals(globals), None)
+
+
+# Compiled templates are shared by all workers and survive restarts; stale
+# entries are purged by the periodic cleanup.
+jinja_bytecode_file_allocator = TempFileAllocator(
+    os.path.join(TEMP_DIR, "docgen-jinja")
+)
+
+jinja_env = BytecodeCachingEnvironment(
+    bytecode_cache=jinja2.FileSystemBytecodeCache(
+        jinja_bytecode_file_allocator.directory
+    ),
+)
 jinja_env.filters.update(
     {
         "load_json": load_json,
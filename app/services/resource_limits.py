@@ -1,6 +1,15 @@
+import atexit
+import importlib
+import inspect
+import math
 import multiprocessing
+import os
+import pickle
 import sys
-from typing import TYPE_CHECKING, Any, Callable, TypeVar
+import threading
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from typing import TYPE_CHECKING, Any, Callable, NoReturn, TypeVar
 from functools import wraps
 
 from app.settings import settings
@@ -32,49 +41,212 @@ class MemoryLimitError(ResourceLimitError):
     pass
 
 
-def _limit_resources() -> None:
+# Workers are reused for this many calls before being replaced, which bounds
+# the memory a long-lived worker can leak or fragment.
+WORKER_MAX_TASKS = 32
+# Idle workers kept around for reuse; extra workers exit once they are done.
+MAX_IDLE_WORKERS = os.cpu_count() or 1
+
+# What pickle raises for objects it cannot serialize
+_PICKLING_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+def _limit_memory() -> None:
     """
-    Set resource limits for the current process.
-    Called at the start of worker processes.
+    Limit the virtual memory (address space) of the current process.
+    Called once when a worker process starts.
     """
     if sys.platform == "win32":
         return
 
-    # Limit virtual memory (address space)
     if settings.MAX_PROCESS_MEMORY:
         resource.setrlimit(
             resource.RLIMIT_AS,
             (settings.MAX_PROCESS_MEMORY, settings.MAX_PROCESS_MEMORY),
         )
 
-    # Limit CPU time
-    if settings.MAX_PROCESS_CPU_TIME:
-        resource.setrlimit(
-            resource.RLIMIT_CPU,
-            (settings.MAX_PROCESS_CPU_TIME, settings.MAX_PROCESS_CPU_TIME),
-        )
-
 
-def _worker_wrapper(
-    func: Callable[..., T],
-    queue: multiprocessing.Queue,  # type: ignore[type-arg]
-    *args: Any,
-    **kwargs: Any,
-) -> None:
+def _limit_cpu_time() -> None:
     """
-    Wrapper function that runs in the worker process.
-    Sets resource limits and executes the target function.
+    Allow the current process ``MAX_PROCESS_CPU_TIME`` more seconds of CPU
+    time.  Called before every call a worker runs, since RLIMIT_CPU counts
+    the CPU time the process has used so far.
     """
+    if sys.platform == "win32" or not settings.MAX_PROCESS_CPU_TIME:
+        return
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = math.ceil(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + settings.MAX_PROCESS_CPU_TIME
+
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _call(func: Callable[..., T], args: Any, kwargs: Any) -> dict[str, Any]:
+    try:
+        _limit_cpu_time()
+        return {"success": True, "result": func(*args, **kwargs)}
+    except TimeoutError as e:
+        return {"success": False, "error": str(e), "type": "timeout"}
+    except MemoryError:
+        return {"success": False, "error": "Memory limit exceeded", "type": "memory"}
+    except Exception as e:
+        return {"success": False, "error": str(e), "type": type(e).__name__}
+
+
+def _send_response(conn: Connection, response: dict[str, Any]) -> None:
     try:
-        _limit_resources()
-        result = func(*args, **kwargs)
-        queue.put({"success": True, "result": result})
+        conn.send(response)
     except MemoryError:
-        queue.put(
+        conn.send(
             {"success": False, "error": "Memory limit exceeded", "type": "memory"}
         )
     except Exception as e:
-        queue.put({"success": False, "error": str(e), "type": type(e).__name__})
+        # The result could not be pickled
+        conn.send({"success": False, "error": str(e), "type": type(e).__name__})
+
+
+def _worker_loop(
+    conn: Connection, call: tuple[Callable[..., Any], Any, Any] | None = None
+) -> None:
+    """
+    Main loop of a worker process: run ``(func, args, kwargs)`` calls received
+    on *conn* and send back their outcome, until ``None`` is received or the
+    pipe is closed.
+
+    A worker started with *call* only runs that call and exits.
+    """
+    _limit_memory()
+
+    if call is not None:
+        _send_response(conn, _call(*call))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        except Exception as e:
+            # The call could not be unpickled
+            response = {"success": False, "error": str(e), "type": type(e).__name__}
+        else:
+            if message is None:
+                return
+
+            func, args, kwargs = message
+            response = _call(func, args, kwargs)
+
+        _send_response(conn, response)
+
+
+class _Worker:
+    """
+    A worker process together with the parent's end of its pipe.
+
+    With *call*, the worker is a one-shot process that runs that call and
+    exits, for calls that cannot be sent through the pipe.  When processes are
+    forked the call is inherited by the child rather than pickled, so lambdas,
+    closures and unpicklable arguments still work there.
+    """
+
+    def __init__(self, call: tuple[Callable[..., Any], Any, Any] | None = None) -> None:
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_loop, args=(child_conn, call), daemon=True
+        )
+
+        try:
+            self.process.start()
+        except BaseException:
+            self.conn.close()
+            raise
+        finally:
+            child_conn.close()
+
+        self.tasks = 0 if call is None else WORKER_MAX_TASKS
+
+    def stop(self) -> None:
+        """Let an idle worker exit."""
+        # Forked workers inherit each other's pipe ends, so closing ours does
+        # not reliably signal EOF; ask the worker to exit instead.
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join(timeout=5)
+
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self) -> None:
+        """Terminate the worker, whatever it is doing."""
+        self.conn.close()
+        self.process.terminate()
+        self.process.join(timeout=5)
+
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+_idle_workers: list[_Worker] = []
+_idle_workers_lock = threading.Lock()
+
+
+def _checkout_worker() -> _Worker:
+    with _idle_workers_lock:
+        while _idle_workers:
+            worker = _idle_workers.pop()
+            if worker.process.is_alive():
+                return worker
+            worker.stop()
+
+    return _Worker()
+
+
+def _return_worker(worker: _Worker) -> None:
+    if worker.tasks < WORKER_MAX_TASKS:
+        with _idle_workers_lock:
+            if len(_idle_workers) < MAX_IDLE_WORKERS:
+                _idle_workers.append(worker)
+                return
+
+    worker.stop()
+
+
+@atexit.register
+def _stop_idle_workers() -> None:
+    """
+    Let idle workers exit cleanly on shutdown, so their exit hooks run,
+    instead of being terminated as daemon processes.
+    """
+    with _idle_workers_lock:
+        workers = list(_idle_workers)
+        _idle_workers.clear()
+
+    for worker in workers:
+        worker.stop()
+
+
+def _raise_for_exitcode(exitcode: int | None) -> NoReturn:
+    if sys.platform == "win32":
+        raise ResourceLimitError(f"Process terminated with exit code {exitcode}")
+
+    # Process was killed (likely by resource limit)
+    if exitcode == -signal.SIGXCPU:
+        raise ResourceLimitError("CPU time limit exceeded")
+    elif exitcode == -signal.SIGKILL or exitcode == -signal.SIGTERM:
+        raise MemoryLimitError("Memory limit exceeded or process killed")
+    elif exitcode == 0:
+        raise ResourceLimitError("Process terminated without returning result")
+    else:
+        raise ResourceLimitError(f"Process terminated with exit code {exitcode}")
 
 
 def run_with_limits(
@@ -83,6 +255,10 @@ def run_with_limits(
     """
     Run a function in a separate process with resource limits.
 
+    Worker processes are kept and reused across calls, so only the first
+    calls pay for starting one.  A worker that times out is killed.  Calls
+    that cannot be pickled, such as lambdas, run in a one-shot process.
+
     Args:
         func: Function to execute
         *args: Positional arguments for func
@@ -101,44 +277,52 @@ def run_with_limits(
     if timeout is None:
         timeout = settings.MAX_CONVERSION_TIME
 
-    queue: multiprocessing.Queue = multiprocessing.Queue()  # type: ignore[type-arg]
-    process = multiprocessing.Process(
-        target=_worker_wrapper, args=(func, queue, *args), kwargs=kwargs
-    )
-
-    process.start()
-    process.join(timeout=timeout)
-
-    if process.is_alive():
-        # Process exceeded timeout
-        process.terminate()
-        process.join(timeout=5)
-        if process.is_alive():
-            process.kill()
-            process.join()
-        raise TimeoutError(f"Operation exceeded {timeout} second timeout")
-
-    if process.exitcode != 0:
-        if sys.platform == "win32":
-            raise ResourceLimitError(
-                f"Process terminated with exit code {process.exitcode}"
-            )
-
-        # Process was killed (likely by resource limit)
-        if process.exitcode == -signal.SIGXCPU:
-            raise ResourceLimitError("CPU time limit exceeded")
-        elif process.exitcode == -signal.SIGKILL or process.exitcode == -signal.SIGTERM:
-            raise MemoryLimitError("Memory limit exceeded or process killed")
-        else:
+    try:
+        payload = ForkingPickler.dumps((func, args, kwargs))
+    except _PICKLING_ERRORS:
+        payload = None
+
+    if payload is None:
+        # Cannot be sent to a reused worker, run it in a process of its own
+        try:
+            worker = _Worker((func, args, kwargs))
+        except _PICKLING_ERRORS as e:
             raise ResourceLimitError(
-                f"Process terminated with exit code {process.exitcode}"
-            )
+                f"Cannot run {func!r} in a separate process: {e}"
+            ) from e
+    else:
+        worker = _checkout_worker()
 
-    # Get result from queue
-    if queue.empty():
-        raise ResourceLimitError("Process terminated without returning result")
+    reusable = False
 
-    response = queue.get()
+    try:
+        if payload is not None:
+            try:
+                worker.conn.send_bytes(payload)
+            except OSError as e:
+                raise ResourceLimitError(
+                    f"Cannot send the call to the worker process: {e}"
+                ) from e
+
+            worker.tasks += 1
+
+        if not worker.conn.poll(timeout):
+            # Process exceeded timeout
+            raise TimeoutError(f"Operation exceeded {timeout} second timeout")
+
+        try:
+            response = worker.conn.recv()
+        except EOFError:
+            worker.process.join()
+            _raise_for_exitcode(worker.process.exitcode)
+
+        reusable = True
+
+    finally:
+        if reusable:
+            _return_worker(worker)
+        else:
+            worker.kill()
 
     if not response["success"]:
         error_type = response.get("type", "Unknown")
@@ -146,6 +330,8 @@ def run_with_limits(
 
         if error_type == "memory":
             raise MemoryLimitError(error_msg)
+        elif error_type == "timeout":
+            raise TimeoutError(error_msg)
         else:
             # Re-raise the original exception type if possible
             raise ResourceLimitError(f"{error_type}: {error_msg}")
@@ -177,6 +363,55 @@ def validate_file_size(file_size: int | None) -> None:
         )
 
 
+def _find_function(module: str, qualname: str) -> Any:
+    obj: Any = importlib.import_module(module)
+
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+
+    return obj
+
+
+def _load_undecorated(module: str, qualname: str) -> Any:
+    return inspect.unwrap(_find_function(module, qualname))
+
+
+class _Undecorated:
+    """
+    Picklable reference to a function whose module-level name is bound to its
+    decorator wrapper.
+
+    Pickle sends functions by module and qualified name, which resolves to the
+    wrapper instead of the function itself.  This reference is unpickled by
+    looking the wrapper up and unwrapping it.
+    """
+
+    def __init__(self, func: Callable[..., Any]) -> None:
+        self.func = func
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.func(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return repr(self.func)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        module = self.func.__module__
+        qualname = self.func.__qualname__
+
+        try:
+            found = _load_undecorated(module, qualname)
+        except (ImportError, AttributeError) as e:
+            raise pickle.PicklingError(f"Can't pickle {self.func!r}: {e}") from e
+
+        if found is not self.func:
+            raise pickle.PicklingError(
+                f"Can't pickle {self.func!r}: it's not found as {module}.{qualname}"
+            )
+
+        return _load_undecorated, (module, qualname)
+
+
 def safe_file_operation(
     timeout: int | None = None,
 ) -> Callable[[Callable[..., T]], Callable[..., T]]:
@@ -194,9 +429,12 @@ def safe_file_operation(
     """
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        target = _Undecorated(func)
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            return run_with_limits(func, *args, timeout=timeout, **kwargs)
+            result: T = run_with_limits(target, *args, timeout=timeout, **kwargs)
+            return result
 
         return wrapper
 
@@ -1,18 +1,96 @@
+import asyncio
+from typing import Any, Callable, Hashable, NamedTuple
+from cachetools import TTLCache
 from fastapi import HTTPException
 
 from app.enums import AccessLevel, UserRole
 from app.models import Scope
 from app.schemas.auth import AuthorizedUser
-from app.services.google_drive import (
-    get_drive_item_metadata,
-    get_item_path,
-)
+from app.services.google_drive import get_folder_graph, get_item_path
+from app.services.google_drive_async import get_drive_item_metadata_async
 from app.constants import DRIVE_FOLDER_MIME_TYPE
 
 
+# Access level and max depth of a scope, all access checks need
+ScopeRestriction = tuple[AccessLevel, int | None]
+
+
+class CachedScopes(NamedTuple):
+    scopes: list[Scope]
+    scope_map: dict[str, Scope]
+    restriction_map: dict[str, ScopeRestriction]
+
+
+# Scopes change rarely and are read on every access check, so the full list
+# and the maps derived from it are kept for a short while. Scope routes call
+# invalidate_scopes_cache() after writing; other worker processes pick up
+# changes once the entry expires.
+scopes_cache: TTLCache[Hashable, CachedScopes] = TTLCache(maxsize=1, ttl=60)
+_scopes_cache_lock = asyncio.Lock()
+
+# Bumped on every invalidation, so results derived from the scopes can be
+# keyed on it.
+scopes_version = 0
+
+
+async def _get_cached_scopes() -> CachedScopes:
+    cached_scopes = scopes_cache.get("all")
+
+    if cached_scopes is None:
+        async with _scopes_cache_lock:
+            cached_scopes = scopes_cache.get("all")
+            if cached_scopes is None:
+                scopes = await Scope.find_all().to_list()
+                cached_scopes = CachedScopes(
+                    scopes,
+                    build_scope_map(scopes),
+                    build_scope_restriction_map(scopes),
+                )
+                scopes_cache["all"] = cached_scopes
+
+    return cached_scopes
+
+
 async def get_all_scopes() -> list[Scope]:
     """Get all scopes from database."""
-    return await Scope.find_all().to_list()
+    cached_scopes = await _get_cached_scopes()
+    return list(cached_scopes.scopes)
+
+
+async def get_scope_map() -> dict[str, Scope]:
+    """
+    Get the shared drive_id -> Scope map of all scopes.  The map is cached,
+    so callers must not modify it.
+    """
+    cached_scopes = await _get_cached_scopes()
+    return cached_scopes.scope_map
+
+
+async def get_scope_restriction_map() -> dict[str, ScopeRestriction]:
+    """
+    Get the shared drive_id -> (access_level, max_depth) map of all scopes.
+    The map is cached, so callers must not modify it.
+    """
+    cached_scopes = await _get_cached_scopes()
+    return cached_scopes.restriction_map
+
+
+# Access check results; see check_document_access()
+document_access_cache: TTLCache[Hashable, tuple[bool, str]] = TTLCache(
+    maxsize=4096, ttl=60
+)
+CACHEABLE_ACCESS_REASONS = frozenset(
+    {"Access granted", "Forbidden", "No scope restrictions configured"}
+)
+
+
+def invalidate_scopes_cache() -> None:
+    """Drop the cached scopes after a scope was created, changed or deleted."""
+    global scopes_version
+
+    scopes_cache.clear()
+    document_access_cache.clear()
+    scopes_version += 1
 
 
 async def get_scope_by_drive_id(drive_id: str) -> Scope | None:
@@ -25,6 +103,34 @@ def build_scope_map(scopes: list[Scope]) -> dict[str, Scope]:
     return {scope.drive_id: scope for scope in scopes}
 
 
+def build_scope_restriction_map(scopes: list[Scope]) -> dict[str, ScopeRestriction]:
+    """
+    Build a map of drive_id -> (access_level, max_depth), the only scope
+    fields access checks read, so path scans skip the model attributes.
+    """
+    return {
+        scope.drive_id: (scope.restrictions.access_level, scope.restrictions.max_depth)
+        for scope in scopes
+    }
+
+
+_ADMIN_ROLES = frozenset({UserRole.ADMIN, UserRole.GOD})
+
+# Who passes each access level; every level but ANY requires authentication
+_ACCESS_CHECKS: dict[AccessLevel, Callable[[AuthorizedUser | None], bool]] = {
+    # ANY - everyone has access
+    AccessLevel.ANY: lambda user: True,
+    # AUTHORIZED - any authenticated user
+    AccessLevel.AUTHORIZED: lambda user: user is not None,
+    # EMAIL_VERIFIED - only users with verified email
+    AccessLevel.EMAIL_VERIFIED: lambda user: (
+        user is not None and user.is_email_verified
+    ),
+    # ADMIN - only admins and gods
+    AccessLevel.ADMIN: lambda user: user is not None and user.role in _ADMIN_ROLES,
+}
+
+
 def check_user_has_scope_access(
     scope: Scope,
     authorized_user: AuthorizedUser | None,
@@ -39,48 +145,51 @@ def check_user_has_scope_access(
     Returns:
         True if user has access, False otherwise
     """
-    access_level = scope.restrictions.access_level
+    return has_access_level(scope.restrictions.access_level, authorized_user)
 
-    # ANY - everyone has access
-    if access_level == AccessLevel.ANY:
-        return True
 
-    # All other levels require authentication
-    if not authorized_user:
-        return False
-
-    # ADMIN - only admins and gods
-    if access_level == AccessLevel.ADMIN:
-        return authorized_user.role in [UserRole.ADMIN, UserRole.GOD]
-
-    # EMAIL_VERIFIED - only users with verified email
-    if access_level == AccessLevel.EMAIL_VERIFIED:
-        return authorized_user.is_email_verified
+def has_access_level(
+    access_level: AccessLevel,
+    authorized_user: AuthorizedUser | None,
+) -> bool:
+    """Check if user passes *access_level*."""
+    check = _ACCESS_CHECKS.get(access_level)
+    return check is not None and check(authorized_user)
 
-    # AUTHORIZED - any authenticated user
-    if access_level == AccessLevel.AUTHORIZED:
-        return True
 
-    return False
+def get_denied_scope_ids(
+    restriction_map: dict[str, ScopeRestriction],
+    authorized_user: AuthorizedUser | None,
+) -> set[str]:
+    """Get the drive IDs of the scopes *authorized_user* does not pass."""
+    return {
+        drive_id
+        for drive_id, (access_level, _) in restriction_map.items()
+        if not has_access_level(access_level, authorized_user)
+    }
 
 
 def is_item_access_allowed(
     item_path: list[str],
-    scope_map: dict[str, Scope],
+    restriction_map: dict[str, ScopeRestriction],
     authorized_user: AuthorizedUser | None,
 ) -> bool:
     depth_from_root = len(item_path) - 1
     has_scopes = False
+    get_restriction = restriction_map.get
 
     for i, drive_id in enumerate(item_path):
-        scope = scope_map.get(drive_id)
-        if scope and (
-            scope.restrictions.max_depth is None
-            or i + scope.restrictions.max_depth >= depth_from_root
-        ):
-            has_scopes = True
-            if not check_user_has_scope_access(scope, authorized_user):
-                return False
+        restriction = get_restriction(drive_id)
+        if restriction is None:
+            continue
+
+        access_level, max_depth = restriction
+        if max_depth is not None and i + max_depth < depth_from_root:
+            continue
+
+        has_scopes = True
+        if not has_access_level(access_level, authorized_user):
+            return False
 
     return has_scopes
 
@@ -92,6 +201,10 @@ async def check_document_access(
     """
     Check if user has access to a document based on scope restrictions.
 
+    Results are cached for a short while per document, scopes version and
+    the user attributes access depends on (role and email verification).
+    Failures to locate the document in Drive are not cached.
+
     Args:
         document_id: Google Drive document ID
         authorized_user: Current user (None if unauthenticated)
@@ -99,33 +212,74 @@ async def check_document_access(
     Returns:
         Tuple of (has_access: bool, reason: str)
     """
-    all_scopes = await get_all_scopes()
+    # GOD users bypass all checks
+    if authorized_user and authorized_user.role == UserRole.GOD:
+        return True, "Access granted"
+
+    user_key = (
+        (authorized_user.role, authorized_user.is_email_verified)
+        if authorized_user
+        else None
+    )
+    key = (document_id, scopes_version, user_key)
+
+    result = document_access_cache.get(key)
+    if result is None:
+        result = await _check_document_access(document_id, authorized_user)
+        if result[1] in CACHEABLE_ACCESS_REASONS:
+            document_access_cache[key] = result
+
+    return result
+
+
+async def _check_document_access(
+    document_id: str,
+    authorized_user: AuthorizedUser | None,
+) -> tuple[bool, str]:
+    restriction_map = await get_scope_restriction_map()
 
-    if not all_scopes:
+    if not restriction_map:
         return False, "No scope restrictions configured"
 
-    scope_map = build_scope_map(all_scopes)
+    # Access is only ever granted through a scope the user passes, so when
+    # none of them does there is no need to locate the document in Drive.
+    if not any(
+        has_access_level(access_level, authorized_user)
+        for access_level, _ in restriction_map.values()
+    ):
+        return False, "Forbidden"
 
-    try:
-        doc_metadata = get_drive_item_metadata(document_id)
-        is_folder = doc_metadata.get("mimeType") == DRIVE_FOLDER_MIME_TYPE
-    except Exception:
+    # Locating the item walks the folder graph, so the graph is loaded (most
+    # often a cache hit) while the metadata request is in flight. A failed
+    # load is retried, and reported, by get_item_path below.
+    doc_metadata: dict[str, Any] | BaseException
+    doc_metadata, _ = await asyncio.gather(
+        get_drive_item_metadata_async(document_id),
+        asyncio.to_thread(get_folder_graph),
+        return_exceptions=True,
+    )
+
+    if isinstance(doc_metadata, BaseException):
         return False, "Document not found in Google Drive"
 
+    is_folder = doc_metadata.get("mimeType") == DRIVE_FOLDER_MIME_TYPE
+
     try:
         if is_folder:
-            item_path = get_item_path(document_id)
+            item_path = await asyncio.to_thread(get_item_path, document_id)
         else:
             item_parents = doc_metadata.get("parents")
             if item_parents:
                 file_parent = item_parents[0]
-                item_path = get_item_path(document_id, file_parent)
+                item_path = await asyncio.to_thread(
+                    get_item_path, document_id, file_parent
+                )
             else:
                 item_path = [document_id]
     except Exception:
         return False, "Cannot determine document location"
 
-    if not is_item_access_allowed(item_path, scope_map, authorized_user):
+    if not is_item_access_allowed(item_path, restriction_map, authorized_user):
         return False, "Forbidden"
 
     return True, "Access granted"
@@ -141,10 +295,6 @@ async def require_document_access(
     Raises:
         HTTPException: 403 if access denied, 404 if document not found
     """
-    # GOD users bypass all checks
-    if authorized_user and authorized_user.role == UserRole.GOD:
-        return
-
     has_access, reason = await check_document_access(document_id, authorized_user)
 
     if not has_access:
@@ -1,7 +1,120 @@
+import http.client
+import multiprocessing.util
+import pathlib
+import socket
 import subprocess
 import os
-import tempfile
-from app.services.resource_limits import run_with_limits
+import shutil
+import signal
+import threading
+import xmlrpc.client
+from app.services.conversion_cache import (
+    get_cached_conversion,
+    get_conversion_key,
+    store_conversion,
+)
+from app.services.resource_limits import TimeoutError, run_with_limits
+from app.settings import settings
+from app.utils.temp_files import TEMP_DIR, link_or_copy, temp_file_allocator
+
+
+# LibreOffice converts one document at a time per process and unoserver
+# queues requests internally, so more conversions than cores only add
+# memory pressure and timeouts.
+MAX_CONCURRENT_CONVERSIONS = os.cpu_count() or 1
+
+_conversion_slots = threading.BoundedSemaphore(MAX_CONCURRENT_CONVERSIONS)
+
+# Time a worker gets past MAX_CONVERSION_TIME to kill soffice and report back
+SOFFICE_KILL_GRACE_SECONDS = 5
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    def __init__(self, timeout: float | None) -> None:
+        super().__init__()
+        self._timeout = timeout
+
+    def make_connection(
+        self, host: tuple[str, dict[str, str]] | str
+    ) -> http.client.HTTPConnection:
+        connection = super().make_connection(host)
+        connection.timeout = self._timeout
+        return connection
+
+
+# Worker profiles are named after the worker's PID, so the parent can tell
+# which ones belong to workers that are gone; see purge_orphaned_profiles().
+SOFFICE_PROFILES_DIR = os.path.join(TEMP_DIR, "docgen-soffice-profiles")
+
+# LibreOffice profile of the current worker process; see _get_profile_dir()
+_profile_dir: str | None = None
+
+
+def _get_profile_dir() -> str:
+    """
+    Return the LibreOffice profile directory of the current worker process.
+
+    soffice processes sharing a profile serialize behind its lock file, so
+    each worker gets its own.  The profile is kept for the worker's lifetime,
+    letting later conversions skip LibreOffice's first-start initialization,
+    and is removed when the worker exits cleanly.
+    """
+    global _profile_dir
+
+    if _profile_dir is None:
+        _profile_dir = os.path.join(SOFFICE_PROFILES_DIR, str(os.getpid()))
+        os.makedirs(_profile_dir, mode=0o700, exist_ok=True)
+        multiprocessing.util.Finalize(
+            None, shutil.rmtree, args=(_profile_dir, True), exitpriority=0
+        )
+
+    return _profile_dir
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+def purge_orphaned_profiles() -> None:
+    """
+    Remove the profiles of workers that no longer exist, such as workers
+    killed on a timeout or resource limit, whose exit hooks never ran.
+    """
+    # os.kill() cannot probe a process on Windows without terminating it
+    if os.name == "nt":
+        return
+
+    try:
+        entries = list(os.scandir(SOFFICE_PROFILES_DIR))
+    except FileNotFoundError:
+        return
+
+    for entry in entries:
+        if entry.name.isdigit() and not _is_process_alive(int(entry.name)):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _kill_process_group(process: subprocess.Popen[bytes]) -> None:
+    """
+    Kill *process* along with the helper processes soffice forks, which
+    share its session.
+    """
+    if os.name == "nt":
+        process.kill()
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    process.wait()
 
 
 def _convert_file_worker(input_path: str, convert_to: str) -> str:
@@ -9,11 +122,13 @@ def _convert_file_worker(input_path: str, convert_to: str) -> str:
     Worker function that performs the actual file conversion.
     This runs in a separate process with resource limits.
     """
-    output_dir = tempfile.gettempdir()
-    os.makedirs(output_dir, exist_ok=True)
+    # Outputs left behind by a killed worker are purged with the other temp files
+    output_dir = temp_file_allocator.directory
+    profile_dir = _get_profile_dir()
 
     cmd = [
         "soffice",
+        f"-env:UserInstallation={pathlib.Path(profile_dir).as_uri()}",
         "--headless",
         "--convert-to",
         convert_to,
@@ -22,14 +137,30 @@ def _convert_file_worker(input_path: str, convert_to: str) -> str:
         input_path,
     ]
 
-    subprocess.run(
+    process = subprocess.Popen(
         cmd,
-        check=True,
         start_new_session=os.name != "nt",
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "HOME": profile_dir},
     )
 
+    try:
+        returncode = process.wait(timeout=settings.MAX_CONVERSION_TIME)
+    except subprocess.TimeoutExpired:
+        _kill_process_group(process)
+        raise TimeoutError(
+            f"Operation exceeded {settings.MAX_CONVERSION_TIME} second timeout"
+        )
+    except BaseException:
+        _kill_process_group(process)
+        raise
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
     base_name = os.path.splitext(os.path.basename(input_path))[0]
-    ext = convert_to.split(":")[0]
+    ext = convert_to.partition(":")[0]
     converted_path = os.path.join(output_dir, f"{base_name}.{ext}")
 
     if not os.path.exists(converted_path):
@@ -40,6 +171,53 @@ def _convert_file_worker(input_path: str, convert_to: str) -> str:
     return converted_path
 
 
+def _convert_file_unoserver(input_path: str, convert_to: str, server_url: str) -> str:
+    """
+    Convert a file through the unoserver listening at *server_url*.
+
+    The document is sent and received over XML-RPC, so the server does not
+    need access to this container's filesystem.
+    """
+    with open(input_path, "rb") as f:
+        input_data = f.read()
+
+    transport = _TimeoutTransport(settings.MAX_CONVERSION_TIME)
+
+    try:
+        with xmlrpc.client.ServerProxy(
+            server_url, transport=transport, allow_none=True
+        ) as proxy:
+            # convert(inpath, indata, outpath, convert_to, filtername,
+            #         filter_options, update_index, infiltername)
+            result = proxy.convert(
+                None, input_data, None, convert_to, None, [], False, None
+            )
+    except socket.timeout:
+        raise TimeoutError(
+            f"Operation exceeded {settings.MAX_CONVERSION_TIME} second timeout"
+        )
+
+    if not isinstance(result, xmlrpc.client.Binary):
+        raise RuntimeError("Conversion failed: unoserver returned no document")
+
+    ext = convert_to.partition(":")[0]
+
+    with temp_file_allocator.acquire(f".{ext}") as output_path:
+        with open(output_path, "wb") as f:
+            f.write(result.data)
+
+    return output_path
+
+
+def _get_worker_timeout() -> int | None:
+    # The worker enforces MAX_CONVERSION_TIME on soffice itself, so it can
+    # clean up; the pool only kills workers that fail to do so.
+    if settings.MAX_CONVERSION_TIME is None:
+        return None
+
+    return settings.MAX_CONVERSION_TIME + SOFFICE_KILL_GRACE_SECONDS
+
+
 def convert_file(input_path: str, convert_to: str) -> str:
     """
     Convert a file using LibreOffice with resource limits.
@@ -60,5 +238,47 @@ def convert_file(input_path: str, convert_to: str) -> str:
         TimeoutError: If conversion exceeds time limit
         MemoryLimitError: If conversion exceeds memory limit
         ResourceLimitError: If conversion fails due to resource limits
+
+    When :attr:`~app.settings.Settings.UNOSERVER_URL` is set the conversion
+    is delegated to that long-running unoserver instead, which avoids the
+    LibreOffice start-up cost on every call.
+
+    When *input_path* already has the target extension it is linked or
+    copied instead of converted.  Results are cached by input content and
+    target format, so repeated conversions are served without LibreOffice.
+
+    At most ``MAX_CONCURRENT_CONVERSIONS`` conversions run at once; further
+    calls block until a slot frees up.
     """
-    return run_with_limits(_convert_file_worker, input_path, convert_to)
+    ext = convert_to.partition(":")[0]
+
+    # Nothing to convert; hand back a new file like a conversion would
+    if os.path.splitext(input_path)[1].lstrip(".").lower() == ext.lower():
+        output_path = temp_file_allocator.reserve(f".{ext}")
+        try:
+            link_or_copy(input_path, output_path)
+        except BaseException:
+            temp_file_allocator.release(output_path)
+            raise
+        return output_path
+
+    key = get_conversion_key(input_path, convert_to)
+    cached_path = get_cached_conversion(key, ext)
+    if cached_path is not None:
+        return cached_path
+
+    with _conversion_slots:
+        if settings.UNOSERVER_URL:
+            output_path = _convert_file_unoserver(
+                input_path, convert_to, settings.UNOSERVER_URL
+            )
+        else:
+            output_path = run_with_limits(
+                _convert_file_worker,
+                input_path,
+                convert_to,
+                timeout=_get_worker_timeout(),
+            )
+
+    store_conversion(key, output_path)
+    return output_path
@@ -0,0 +1,79 @@
+import os
+import threading
+
+from app.schemas.google import DriveFile
+from app.utils.temp_files import (
+    TEMP_DIR,
+    FileCache,
+    TempFileAllocator,
+    link_or_copy,
+    temp_file_allocator,
+)
+
+
+TEMPLATE_CACHE_MAXSIZE = 128
+TEMPLATE_CACHE_TTL_SECONDS = 3600
+
+# Cached copies live in their own directory so the periodic purge of request temp
+# files never touches them; whatever is left is removed on shutdown.
+template_file_allocator = TempFileAllocator(os.path.join(TEMP_DIR, "docgen-templates"))
+
+
+template_cache = FileCache(
+    TEMPLATE_CACHE_MAXSIZE, TEMPLATE_CACHE_TTL_SECONDS, template_file_allocator
+)
+_template_cache_lock = threading.Lock()
+
+
+def _get_cache_key(document: DriveFile) -> tuple[str, str]:
+    return document.id, document.modified_time.isoformat()
+
+
+def get_cached_template(document: DriveFile) -> str | None:
+    """
+    Return a temp file holding the cached ``.docx`` of *document*, or ``None``
+    on a miss.
+
+    The file is hard-linked to the cache entry when possible, so it must be
+    treated as read-only.  The caller is responsible for releasing it.
+    """
+    with _template_cache_lock:
+        cached_path = template_cache.get(_get_cache_key(document))
+
+    if cached_path is None:
+        return None
+
+    docx_path = temp_file_allocator.reserve(".docx")
+
+    try:
+        link_or_copy(cached_path, docx_path)
+    except FileNotFoundError:
+        # Evicted between the lookup and the copy.
+        temp_file_allocator.release(docx_path)
+        return None
+
+    return docx_path
+
+
+def store_template(document: DriveFile, docx_path: str) -> None:
+    """
+    Keep a copy of *docx_path* as the cached ``.docx`` of *document*.
+
+    Caching is best effort: failing to write the copy is not an error.
+    """
+    cached_path = template_file_allocator.reserve(".docx")
+
+    try:
+        link_or_copy(docx_path, cached_path)
+    except OSError:
+        template_file_allocator.release(cached_path)
+        return
+
+    key = _get_cache_key(document)
+
+    with _template_cache_lock:
+        replaced_path = template_cache.pop(key, None)
+        template_cache[key] = cached_path
+
+    if replaced_path is not None:
+        template_file_allocator.release(replaced_path)
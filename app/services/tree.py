@@ -1,9 +1,8 @@
-from collections import defaultdict
+import asyncio
 from typing import Any
 from fastapi import HTTPException
 
 from app.constants import DOC_COMPATIBLE_MIME_TYPES, DRIVE_FOLDER_MIME_TYPE
-from app.models import Scope
 from app.schemas.auth import AuthorizedUser
 from app.schemas.scopes import FolderTree
 from app.schemas.google import DriveFile
@@ -11,13 +10,16 @@ from app.services.google_drive import (
     ensure_folder,
     format_drive_file_metadata,
     format_drive_folder_metadata,
-    get_drive_item_metadata,
+    get_drive_items_metadata,
     get_item_path,
 )
+from app.services.google_drive_async import get_drive_item_metadata_async
 from app.services.scopes import (
-    build_scope_map,
-    check_user_has_scope_access,
-    get_all_scopes,
+    ScopeRestriction,
+    get_denied_scope_ids,
+    get_scope_map,
+    get_scope_restriction_map,
+    has_access_level,
     is_item_access_allowed,
 )
 
@@ -46,154 +48,142 @@ def build_children_map(
     drive_items: list[dict[str, Any]],
 ) -> dict[str, list[dict[str, Any]]]:
     """Build a map of parent_id -> list of children."""
-    children_map: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    for item in drive_items:
-        for parent_id in item.get("parents", []):
-            children_map[parent_id].append(item)
-    return children_map
-
-
-def update_scope_for_item(
-    item_id: str,
-    parent_scope: Scope | None,
-    parent_depth: int,
-    parent_path: list[str],
-    scope_map: dict[str, Scope],
-    authorized_user: AuthorizedUser | None,
-) -> tuple[Scope | None, int, list[str]]:
-    """
-    Update the effective scope for an item based on its ID.
-
-    This function checks if the item has a scope defined on it,
-    and if so, returns the new scope. Otherwise, it increments
-    the depth from the parent scope.
-
-    Args:
-        item_id: The current item's drive ID
-        parent_scope: The parent's effective scope
-        parent_depth: Depth from parent's scope
-        parent_path: Path to parent
-        scope_map: Map of drive_id -> Scope
-        authorized_user: Current user
+    children_map: dict[str, list[dict[str, Any]]] = {}
+    get_children = children_map.get
 
-    Returns:
-        Tuple of (effective_scope, depth_from_scope, item_path)
-    """
-    # Build current path
-    item_path = parent_path + [item_id]
-
-    # Check if this item has a scope defined on it
-    if item_id in scope_map:
-        new_scope = scope_map[item_id]
-
-        if check_user_has_scope_access(new_scope, authorized_user):
-            return new_scope, 0, item_path
-        else:
-            return None, -1, item_path
+    for item in drive_items:
+        parents = item.get("parents")
+        if not parents:
+            continue
 
-    # No new scope, use parent's scope with incremented depth
-    if parent_scope is None:
-        return None, -1, item_path
+        for parent_id in parents:
+            children = get_children(parent_id)
+            if children is None:
+                children_map[parent_id] = [item]
+            else:
+                children.append(item)
 
-    return parent_scope, parent_depth + 1, item_path
+    return children_map
 
 
 def build_folder_tree(
     item: dict[str, Any],
     parent_node: FolderTree,
     allowed_depth: int | None,
-    scope_map: dict[str, Scope],
+    restriction_map: dict[str, ScopeRestriction],
     children_map: dict[str, list[dict[str, Any]]],
-    authorized_user: AuthorizedUser | None,
+    denied_ids: set[str],
     visited: set[str],
 ) -> None:
     """
-    Recursively build tree node with access control.
+    Add *item* and its accessible descendants to *parent_node*.
 
-    Returns:
-        FolderTree node or None if not accessible
-    """
-    item_id = item["id"]
+    *denied_ids* are the scopes the user does not pass, see
+    :func:`get_denied_scope_ids`.
 
-    # Prevent infinite loops
-    if item_id in visited:
-        return
+    The subtree is walked depth-first with an explicit stack, so deep
+    folder hierarchies cannot hit the recursion limit.
+    """
+    stack: list[tuple[dict[str, Any], FolderTree, int | None]] = [
+        (item, parent_node, allowed_depth)
+    ]
+
+    while stack:
+        item, parent_node, allowed_depth = stack.pop()
+        item_id = item["id"]
+        mime_type = item["mimeType"]
+        is_folder = mime_type == DRIVE_FOLDER_MIME_TYPE
 
-    visited.add(item_id)
+        # Prevent infinite loops and duplicates. Only folders are expanded,
+        # so a file with a single parent cannot be reached twice and needs
+        # no bookkeeping.
+        if is_folder or len(item["parents"]) > 1:
+            if item_id in visited:
+                continue
 
-    mime_type = item["mimeType"]
-    is_folder = mime_type == DRIVE_FOLDER_MIME_TYPE
+            visited.add(item_id)
 
-    if allowed_depth is not None:
-        allowed_depth -= 1
+        if allowed_depth is not None:
+            allowed_depth -= 1
 
-    new_scope = scope_map.get(item_id)
-    if new_scope:
-        if not check_user_has_scope_access(new_scope, authorized_user):
-            return
+        restriction = restriction_map.get(item_id)
+        if restriction is not None:
+            if item_id in denied_ids:
+                continue
 
-        if allowed_depth is not None:
-            if new_scope.restrictions.max_depth is None:
-                allowed_depth = None
-            elif allowed_depth < new_scope.restrictions.max_depth:
-                allowed_depth = new_scope.restrictions.max_depth
+            max_depth = restriction[1]
 
-    if allowed_depth is not None and allowed_depth < 0:
-        return
+            if allowed_depth is not None:
+                if max_depth is None:
+                    allowed_depth = None
+                elif allowed_depth < max_depth:
+                    allowed_depth = max_depth
 
-    if is_folder:
-        folder = format_drive_folder_metadata(item)
-        folder_tree = FolderTree(current_folder=folder, documents=[], folders=[])
+        if allowed_depth is not None and allowed_depth < 0:
+            continue
 
-        if parent_node is not None:
+        if is_folder:
+            folder = format_drive_folder_metadata(item)
+            folder_tree = FolderTree.model_construct(
+                current_folder=folder, documents=[], folders=[]
+            )
             parent_node.folders.append(folder_tree)
-            children = children_map.get(folder.id, [])
-
-            for child in children:
-                build_folder_tree(
-                    child,
-                    folder_tree,
-                    allowed_depth,
-                    scope_map,
-                    children_map,
-                    authorized_user,
-                    visited,
-                )
 
-        return
+            # Reversed, so children are popped, and added, in listing order
+            children = children_map.get(folder.id, [])
+            stack.extend(
+                (child, folder_tree, allowed_depth) for child in reversed(children)
+            )
 
-    if mime_type in DOC_COMPATIBLE_MIME_TYPES:
-        if parent_node is None:
-            return
+            continue
 
-        document = format_drive_file_metadata(item)
-        parent_node.documents.append(document)
+        if mime_type in DOC_COMPATIBLE_MIME_TYPES:
+            document = format_drive_file_metadata(item)
+            parent_node.documents.append(document)
 
 
 def get_max_allowed_item_scope_depth(
     item_path: list[str],
-    scope_map: dict[str, Scope],
+    restriction_map: dict[str, ScopeRestriction],
     authorized_user: AuthorizedUser | None,
+    denied_ids: set[str] | None = None,
 ) -> int | None:
+    """
+    Get the deepest path index the scopes on *item_path* give access to
+    (``None`` = infinite), or -1 when a scope on it denies access.
+
+    *denied_ids* (see :func:`get_denied_scope_ids`) lets the scan stop as
+    soon as access is unbounded and no denied scope lies further down.
+    """
     depth_from_root = len(item_path) - 1
     max_scope_depth: int | None = -1
 
     for i, drive_id in enumerate(item_path):
-        scope = scope_map.get(drive_id)
-        if scope and (
-            scope.restrictions.max_depth is None
-            or i + scope.restrictions.max_depth >= depth_from_root
-        ):
-            if max_scope_depth is not None:
-                if scope.restrictions.max_depth is None:
-                    max_scope_depth = None
-                else:
-                    scope_depth = i + scope.restrictions.max_depth
-                    if max_scope_depth < scope_depth:
-                        max_scope_depth = scope_depth
+        restriction = restriction_map.get(drive_id)
+        if restriction is None:
+            continue
+
+        access_level, max_depth = restriction
+        if max_depth is not None and i + max_depth < depth_from_root:
+            continue
+
+        if max_scope_depth is not None:
+            if max_depth is None:
+                max_scope_depth = None
+            else:
+                scope_depth = i + max_depth
+                if max_scope_depth < scope_depth:
+                    max_scope_depth = scope_depth
 
-            if not check_user_has_scope_access(scope, authorized_user):
-                return -1
+        if not has_access_level(access_level, authorized_user):
+            return -1
+
+        if (
+            max_depth is None
+            and denied_ids is not None
+            and denied_ids.isdisjoint(item_path[i + 1 :])
+        ):
+            break
 
     return max_scope_depth
 
@@ -215,26 +205,27 @@ async def get_single_folder_tree(
         FolderTree with the folder and its accessible children
     """
     try:
-        item_metadata = get_drive_item_metadata(folder_id)
+        item_metadata = await get_drive_item_metadata_async(folder_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Drive item not found")
 
     ensure_folder(item_metadata["mimeType"])
 
-    all_scopes = await get_all_scopes()
-    scope_map = build_scope_map(all_scopes)
+    restriction_map = await get_scope_restriction_map()
 
     try:
-        folder_path = get_item_path(folder_id)
+        folder_path = await asyncio.to_thread(get_item_path, folder_id)
     except Exception:
         raise HTTPException(
             status_code=403, detail="Cannot determine document location"
         )
 
+    denied_ids = get_denied_scope_ids(restriction_map, authorized_user)
     allowed_depth = get_max_allowed_item_scope_depth(
         folder_path,
-        scope_map,
+        restriction_map,
         authorized_user,
+        denied_ids,
     )
 
     if allowed_depth is not None:
@@ -242,7 +233,9 @@ async def get_single_folder_tree(
             raise HTTPException(status_code=403, detail="Access denied")
 
     folder = format_drive_folder_metadata(item_metadata)
-    folder_tree = FolderTree(folders=[], documents=[], current_folder=folder)
+    folder_tree = FolderTree.model_construct(
+        folders=[], documents=[], current_folder=folder
+    )
     children = children_map.get(folder.id, [])
 
     visited: set[str] = set()
@@ -253,15 +246,42 @@ async def get_single_folder_tree(
             child,
             folder_tree,
             allowed_depth,
-            scope_map,
+            restriction_map,
             children_map,
-            authorized_user,
+            denied_ids,
             visited,
         )
 
     return folder_tree
 
 
+def _get_root_paths(
+    items_metadata: dict[str, dict[str, Any]],
+) -> dict[str, list[str]]:
+    """
+    Locate the pinned root items in *items_metadata* (folders and
+    documents).  Folders whose location cannot be determined are left out.
+    """
+    paths: dict[str, list[str]] = {}
+
+    for item_id, metadata in items_metadata.items():
+        mime_type = metadata.get("mimeType", "")
+
+        if mime_type == DRIVE_FOLDER_MIME_TYPE:
+            try:
+                paths[item_id] = get_item_path(item_id)
+            except Exception:
+                continue
+        elif mime_type in DOC_COMPATIBLE_MIME_TYPES:
+            item_parents = metadata.get("parents")
+            if item_parents:
+                paths[item_id] = get_item_path(item_id, item_parents[0])
+            else:
+                paths[item_id] = [item_id]
+
+    return paths
+
+
 async def get_all_pinned_scopes_tree(
     children_map: dict[str, list[dict[str, Any]]],
     authorized_user: AuthorizedUser | None,
@@ -276,19 +296,26 @@ async def get_all_pinned_scopes_tree(
     Returns:
         FolderTree containing all accessible pinned scopes as roots
     """
-    all_scopes = await get_all_scopes()
-    scope_map = build_scope_map(all_scopes)
-    pinned_scopes = [scope for scope in all_scopes if scope.is_pinned]
+    scope_map = await get_scope_map()
+    restriction_map = await get_scope_restriction_map()
+    pinned_scopes = [scope for scope in scope_map.values() if scope.is_pinned]
 
     roots: list[FolderTree] = []
     root_documents: list[DriveFile] = []
     visited: set[str] = set()
 
+    # Fetch all root items in a single batch, then locate them all in one
+    # worker thread call
+    pinned_metadata = await asyncio.to_thread(
+        get_drive_items_metadata, [scope.drive_id for scope in pinned_scopes]
+    )
+    root_paths = await asyncio.to_thread(_get_root_paths, pinned_metadata)
+    denied_ids = get_denied_scope_ids(restriction_map, authorized_user)
+
     for scope in pinned_scopes:
         # Get the root item
-        try:
-            root_metadata = get_drive_item_metadata(scope.drive_id)
-        except Exception:
+        root_metadata = pinned_metadata.get(scope.drive_id)
+        if root_metadata is None:
             continue
 
         # Clear visited for each scope to allow same items in different scopes
@@ -298,15 +325,15 @@ async def get_all_pinned_scopes_tree(
         is_folder = mime_type == DRIVE_FOLDER_MIME_TYPE
 
         if is_folder:
-            try:
-                folder_path = get_item_path(scope.drive_id)
-            except Exception:
+            folder_path = root_paths.get(scope.drive_id)
+            if folder_path is None:
                 continue
 
             allowed_depth = get_max_allowed_item_scope_depth(
                 folder_path,
-                scope_map,
+                restriction_map,
                 authorized_user,
+                denied_ids,
             )
 
             if allowed_depth is not None:
@@ -314,7 +341,9 @@ async def get_all_pinned_scopes_tree(
                     continue
 
             folder = format_drive_folder_metadata(root_metadata)
-            folder_tree = FolderTree(folders=[], documents=[], current_folder=folder)
+            folder_tree = FolderTree.model_construct(
+                folders=[], documents=[], current_folder=folder
+            )
             roots.append(folder_tree)
 
             children = children_map.get(folder.id, [])
@@ -324,22 +353,16 @@ async def get_all_pinned_scopes_tree(
                     child,
                     folder_tree,
                     allowed_depth,
-                    scope_map,
+                    restriction_map,
                     children_map,
-                    authorized_user,
+                    denied_ids,
                     visited,
                 )
 
         elif mime_type in DOC_COMPATIBLE_MIME_TYPES:
-            item_parents = root_metadata.get("parents")
-            if item_parents:
-                file_parent = item_parents[0]
-                item_path = get_item_path(scope.drive_id, file_parent)
-            else:
-                item_path = [scope.drive_id]
-
-            if is_item_access_allowed(item_path, scope_map, authorized_user):
+            item_path = root_paths[scope.drive_id]
+            if is_item_access_allowed(item_path, restriction_map, authorized_user):
                 document = format_drive_file_metadata(root_metadata)
                 root_documents.append(document)
 
-    return FolderTree(folders=roots, documents=root_documents)
+    return FolderTree.model_construct(folders=roots, documents=root_documents)
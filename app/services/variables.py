@@ -1,8 +1,13 @@
-from typing import Any
+import asyncio
+import json
+from typing import Any, Hashable
 from beanie import PydanticObjectId
 from beanie.operators import In, Eq
-import jsonschema
+from cachetools import LRUCache, cached
 from jsonschema import ValidationError as JsonSchemaValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 
 from app.models import Variable, SavedVariable
 from app.services.google_drive import get_item_path
@@ -10,6 +15,36 @@ from app.exceptions import ValidationErrorsException
 from app.constants import DEFAULT_VARIABLE_ORDER
 
 
+# Checking a schema and building its validator costs far more than running
+# it, and the same few schemas are used over and over.
+schema_validator_cache: LRUCache[Hashable, Validator] = LRUCache(maxsize=256)
+
+
+@cached(
+    schema_validator_cache,
+    key=lambda schema: json.dumps(schema, sort_keys=True),
+)
+def get_schema_validator(schema: dict[str, Any]) -> Validator:
+    """Return a checked, reusable validator for *schema*."""
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    validator: Validator = validator_class(schema)
+    return validator
+
+
+def validate_against_schema(value: Any, schema: dict[str, Any]) -> None:
+    """
+    Validate *value* against *schema*, like :func:`jsonschema.validate` but
+    with the schema's validator reused across calls.
+
+    Raises:
+        jsonschema.ValidationError: If *value* does not match *schema*
+    """
+    error = best_match(get_schema_validator(schema).iter_errors(value))
+    if error is not None:
+        raise error
+
+
 async def get_effective_variables_for_document(
     document_id: str,
     template_variables: set[str],
@@ -30,7 +65,7 @@ async def get_effective_variables_for_document(
     """
     # Get scope chain for the document
     try:
-        scope_chain = get_item_path(document_id, file_parent)
+        scope_chain = await asyncio.to_thread(get_item_path, document_id, file_parent)
     except Exception:
         scope_chain = []
 
@@ -45,19 +80,24 @@ async def get_effective_variables_for_document(
     # Organize by name, keeping most specific scope
     effective_db_vars: dict[str, Variable] = {}
 
+    # Precompute scope priority once: higher index = more specific,
+    # global and unknown scopes = 0
+    scope_order: dict[str | None, int] = {
+        scope: i for i, scope in enumerate(scope_chain)
+    }
+    get_priority = scope_order.get
+
     for var in db_variables:
-        if var.variable in template_variables:
-            if var.variable not in effective_db_vars:
-                effective_db_vars[var.variable] = var
-            else:
-                # Check if this variable is more specific
-                current_priority = get_scope_priority(
-                    effective_db_vars[var.variable].scope, scope_chain
-                )
-                new_priority = get_scope_priority(var.scope, scope_chain)
+        if var.variable not in template_variables:
+            continue
 
-                if new_priority > current_priority:
-                    effective_db_vars[var.variable] = var
+        current = effective_db_vars.get(var.variable)
+
+        # Keep the new variable if it is more specific
+        if current is None or get_priority(var.scope, 0) > get_priority(
+            current.scope, 0
+        ):
+            effective_db_vars[var.variable] = var
 
     # Get user's saved variables if user_id provided
     saved_values: dict[str, Any] = {}
@@ -66,11 +106,20 @@ async def get_effective_variables_for_document(
             SavedVariable.user.id == user_id  # type: ignore[attr-defined]
         ).to_list()
 
+        # Resolve the names of all linked Variables with a single query
+        variable_ids = list({saved.variable.ref.id for saved in saved_vars})
+        variable_names: dict[PydanticObjectId, str] = {}
+
+        if variable_ids:
+            linked_vars = await Variable.find(In(Variable.id, variable_ids)).to_list()
+            variable_names = {
+                var.id: var.variable for var in linked_vars if var.id is not None
+            }
+
         for saved in saved_vars:
-            # Get the variable name from the linked Variable
-            var_obj = await Variable.get(saved.variable.ref.id)
-            if var_obj and var_obj.variable in template_variables:
-                saved_values[var_obj.variable] = saved.value
+            var_name = variable_names.get(saved.variable.ref.id)
+            if var_name is not None and var_name in template_variables:
+                saved_values[var_name] = saved.value
 
     # Build result for all template variables
     result: dict[str, dict[str, Any]] = {}
@@ -103,23 +152,6 @@ async def get_effective_variables_for_document(
     return result
 
 
-def get_scope_priority(scope: str | None, scope_chain: list[str]) -> int:
-    """
-    Get priority of a scope in the chain.
-    Higher number = more specific (higher priority).
-    """
-    if not scope_chain:
-        return 0
-
-    if scope is None:
-        return 0
-
-    try:
-        return scope_chain.index(scope)
-    except ValueError:
-        return 0
-
-
 async def resolve_variables_for_generation(
     document_id: str,
     template_variables: set[str],
@@ -182,9 +214,7 @@ async def resolve_variables_for_generation(
             # Validate against schema if exists
             if var_info["validation_schema"]:
                 try:
-                    jsonschema.validate(
-                        instance=value, schema=var_info["validation_schema"]
-                    )
+                    validate_against_schema(value, var_info["validation_schema"])
                     context[var_name] = value
                 except JsonSchemaValidationError as e:
                     errors[var_name] = f"Validation error: {e.message}"
@@ -198,9 +228,7 @@ async def resolve_variables_for_generation(
             # Validate saved value against schema if exists
             if var_info["validation_schema"]:
                 try:
-                    jsonschema.validate(
-                        instance=value, schema=var_info["validation_schema"]
-                    )
+                    validate_against_schema(value, var_info["validation_schema"])
                     context[var_name] = value
                 except JsonSchemaValidationError as e:
                     errors[var_name] = f"Saved value validation error: {e.message}"
@@ -228,7 +256,7 @@ async def get_variable_overrides(
         return []
 
     try:
-        scope_chain = get_item_path(current_scope)
+        scope_chain = await asyncio.to_thread(get_item_path, current_scope)
     except Exception:
         return []
 
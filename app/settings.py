@@ -21,6 +21,14 @@ class Settings(BaseSettings):
     MAX_PROCESS_CPU_TIME: int | None = None
     MAX_CONVERSION_TIME: int | None = None
 
+    # XML-RPC endpoint of a running unoserver, e.g. "http://127.0.0.1:2003".
+    # When unset every conversion starts a fresh soffice process.
+    UNOSERVER_URL: str | None = None
+
+    # Directory for request temp files and soffice output, e.g. "/dev/shm" to
+    # keep them in memory.  Defaults to the system temporary directory.
+    TMPFS_DIR: str | None = None
+
     MAX_IMAGE_FETCH_TIME: int | None = 10
     MAX_IMAGE_SIZE: int | None = 5 * 1024 * 1024  # 5 MiB
 
@@ -3,6 +3,13 @@ from datetime import datetime, timedelta, timezone
 
 from app.settings import settings
 from app.models import Session
+from app.services.jinja import jinja_bytecode_file_allocator
+from app.services.soffice import purge_orphaned_profiles
+from app.utils.temp_files import temp_file_allocator
+
+TEMP_FILE_MAX_AGE_SECONDS = 3600
+# Templates in use are compiled again at most once a day
+JINJA_BYTECODE_MAX_AGE_SECONDS = 24 * 3600
 
 
 async def cleanup_old_sessions() -> None:
@@ -12,7 +19,14 @@ async def cleanup_old_sessions() -> None:
     await Session.find(Session.updated_at < expire_date).delete()
 
 
+def cleanup_orphaned_temp_files() -> None:
+    temp_file_allocator.purge(TEMP_FILE_MAX_AGE_SECONDS)
+    jinja_bytecode_file_allocator.purge(JINJA_BYTECODE_MAX_AGE_SECONDS)
+    purge_orphaned_profiles()
+
+
 async def periodic_cleanup(interval_seconds: int = 3600) -> None:
     while True:
         await cleanup_old_sessions()
+        cleanup_orphaned_temp_files()
         await asyncio.sleep(interval_seconds)
@@ -0,0 +1,186 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from typing import Hashable, Iterator
+
+from cachetools import TTLCache
+
+from app.settings import settings
+
+
+def unlink_quiet(path: str | None) -> None:
+    """Remove *path* if it exists; ``None`` and missing files are ignored."""
+    if path is None:
+        return
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def fast_copy(src: str, dst: str) -> None:
+    """
+    Copy the contents of *src* into the existing file *dst*.
+
+    Uses :func:`os.sendfile` so the data never leaves the kernel; platforms
+    without it fall back to a buffered copy with a 1 MiB buffer.
+    """
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        if hasattr(os, "sendfile"):
+            size = os.fstat(src_file.fileno()).st_size
+            offset = 0
+
+            while offset < size:
+                sent = os.sendfile(
+                    dst_file.fileno(), src_file.fileno(), offset, size - offset
+                )
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(src_file, dst_file, length=1024 * 1024)
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """
+    Make *dst* a hard link to *src*, or a copy of it where linking fails
+    (e.g. across filesystems).  *dst* must not exist yet.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        fast_copy(src, dst)
+
+
+def _release_all(paths: set[str]) -> None:
+    for path in list(paths):
+        unlink_quiet(path)
+
+    paths.clear()
+
+
+class TempFileAllocator:
+    """
+    Allocator for the temporary files created while downloading, rendering
+    and converting documents.
+
+    Files are not reused: each one is created on demand and deleted on
+    release.  Every file lives in a single private directory, so files
+    orphaned by a crashed worker can be reclaimed by :meth:`purge` instead of
+    piling up in the system temporary directory.  Files still registered as
+    in use when the allocator is garbage collected (or the interpreter exits)
+    are removed by a :func:`weakref.finalize` hook.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        self._in_use: set[str] = set()
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _release_all, self._in_use)
+
+    def create(self, suffix: str = "") -> str:
+        """Create an empty file in the directory and return its path."""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.directory)
+        os.close(fd)
+
+        with self._lock:
+            self._in_use.add(path)
+
+        return path
+
+    def reserve(self, suffix: str = "") -> str:
+        """
+        Return a fresh path in the directory without creating the file.
+
+        Lets the writer create the file with a single open.  The path counts
+        as in use until it is released, whether or not the file was written.
+        """
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}{suffix}")
+
+        with self._lock:
+            self._in_use.add(path)
+
+        return path
+
+    def release(self, path: str) -> None:
+        """Delete *path* and forget about it.  Missing files are ignored."""
+        with self._lock:
+            self._in_use.discard(path)
+
+        unlink_quiet(path)
+
+    @contextmanager
+    def acquire(self, suffix: str = "") -> Iterator[str]:
+        """
+        Yield a fresh temporary file path.
+
+        The file is released if the block raises; otherwise ownership passes
+        to the caller, who must eventually call :meth:`release`.
+        """
+        path = self.create(suffix)
+
+        try:
+            yield path
+        except BaseException:
+            self.release(path)
+            raise
+
+    def purge(self, max_age: float) -> None:
+        """Remove files older than *max_age* seconds that are not in use."""
+        threshold = time.time() - max_age
+
+        with self._lock:
+            in_use = set(self._in_use)
+
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+
+        for entry in entries:
+            if entry.path in in_use or not entry.is_file(follow_symlinks=False):
+                continue
+
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime < threshold:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class FileCache(TTLCache[Hashable, str]):
+    """
+    TTLCache whose values are files of *allocator*.
+
+    Files of entries that expire or are evicted are released.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, allocator: TempFileAllocator) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.allocator = allocator
+
+    def expire(self, time: float | None = None) -> list[tuple[Hashable, str]]:
+        expired: list[tuple[Hashable, str]] = super().expire(time)
+
+        for _, path in expired:
+            self.allocator.release(path)
+
+        return expired
+
+    def popitem(self) -> tuple[Hashable, str]:
+        key, path = super().popitem()
+        self.allocator.release(path)
+        return key, path
+
+
+TEMP_DIR = settings.TMPFS_DIR or tempfile.gettempdir()
+
+temp_file_allocator = TempFileAllocator(os.path.join(TEMP_DIR, "docgen"))
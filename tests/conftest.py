@@ -0,0 +1,12 @@
+import os
+
+
+# Settings without defaults, so that app modules can be imported in tests
+os.environ.setdefault("SERVICE_ACCOUNT_FILE", "service-account.json")
+os.environ.setdefault("DATABASE_URL", "mongodb://localhost:27017/docs-generator")
+os.environ.setdefault("API_URL", "http://localhost:8000")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+os.environ.setdefault("JWT_SECRET", "secret")
+os.environ.setdefault("MAILER_URL", "http://localhost:8080")
+os.environ.setdefault("MAILER_TOKEN", "token")
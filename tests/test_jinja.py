@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.jinja import format_datetime
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2024",
+        "2024-01",
+        "2024-02-30T10:00:00",
+        "2023-02-29T10:00",
+        "2024-01-01T24:00:00",
+        "2024-01-01T10:00:00+24:00",
+        "not a date",
+    ],
+)
+@pytest.mark.parametrize("fmt", ["%Y-%m-%d %H:%M", "%d.%m.%Y"])
+def test_format_datetime_invalid(value: str, fmt: str) -> None:
+    assert format_datetime(value, fmt) == value
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-02-29T10:05", "2024-02-29 10:05"),
+        ("2024-01-31T23:59:59.123456Z", "2024-01-31 23:59"),
+        ("2024-01-01T10:00:00+05:30", "2024-01-01 10:00"),
+        ("2024-01-01 10:00", "2024-01-01 10:00"),
+        ("2024-01-01", "2024-01-01 00:00"),
+    ],
+)
+def test_format_datetime(value: str, expected: str) -> None:
+    assert format_datetime(value) == expected
+
+
+def test_format_datetime_custom_format() -> None:
+    assert format_datetime("2024-01-01T10:00:00+05:30", "%d.%m.%Y %z") == (
+        "01.01.2024 +0530"
+    )
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from app.services.resource_limits import (
+    ResourceLimitError,
+    run_with_limits,
+    safe_file_operation,
+)
+
+
+@safe_file_operation(timeout=10)
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@safe_file_operation(timeout=10)
+def fail() -> None:
+    raise ValueError("failed")
+
+
+def test_decorated_function() -> None:
+    assert add(1, 2) == 3
+    assert add(2, b=3) == 5
+
+
+def test_decorated_function_error() -> None:
+    with pytest.raises(ResourceLimitError, match="ValueError: failed"):
+        fail()
+
+
+def test_decorated_local_function() -> None:
+    @safe_file_operation(timeout=10)
+    def local() -> str:
+        return "local"
+
+    assert local() == "local"
+
+
+def test_lambda() -> None:
+    assert run_with_limits(lambda: 1, timeout=10) == 1
+
+
+def test_closure() -> None:
+    value = 42
+
+    def closure() -> int:
+        return value
+
+    assert run_with_limits(closure, timeout=10) == 42
+
+
+def test_unpicklable_argument() -> None:
+    lock = threading.Lock()
+
+    assert run_with_limits(lambda lock: lock.locked(), lock, timeout=10) is False
+
+
+def test_unpicklable_result() -> None:
+    with pytest.raises(ResourceLimitError):
+        run_with_limits(threading.Lock, timeout=10)